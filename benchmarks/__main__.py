@@ -0,0 +1,138 @@
+'''Run the benchmark suite and append results to a history file.
+
+Benchmarks are written in the airspeed velocity (asv) style:
+classes in ``benchmarks/bench_*.py`` with ``time_*`` methods and
+optional ``params``/``param_names``/``setup``/``teardown``.  This
+runner needs
+nothing beyond the standard library::
+
+    python -m benchmarks                  # run everything
+    python -m benchmarks -k Inplacetuning # filter by name
+    python -m benchmarks --compare        # against last run
+
+Each run is one JSON line in the history file holding the commit,
+time, machine and the best time per call of every benchmark.
+'''
+
+import argparse
+import importlib
+import inspect
+import itertools
+import json
+import os
+import platform
+import re
+import subprocess
+import time
+import timeit
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+def _modules():
+    for name in sorted(os.listdir(_HERE)):
+        if name.startswith('bench_') and name.endswith('.py'):
+            yield importlib.import_module('benchmarks.' + name[:-3])
+
+def _param_sets(cls):
+    '''Cartesian product of the class params.'''
+    params = getattr(cls, 'params', None)
+    if params is None:
+        return [()]
+    if not params or not isinstance(params[0], (list, tuple)):
+        params = [params]
+    return list(itertools.product(*params))
+
+def _benchmarks(pattern):
+    '''Yield (name, instance, method, params) to time.'''
+    for mod in _modules():
+        for cname, cls in inspect.getmembers(mod, inspect.isclass):
+            if cls.__module__ != mod.__name__:
+                continue
+            for mname in sorted(dir(cls)):
+                if not mname.startswith('time_'):
+                    continue
+                name = '%s.%s.%s' % (
+                    mod.__name__.split('.')[-1], cname, mname)
+                if pattern and not re.search(pattern, name):
+                    continue
+                for args in _param_sets(cls):
+                    yield name, cls(), mname, args
+
+def _time(obj, mname, args, repeat):
+    '''Best seconds per call.'''
+    if hasattr(obj, 'setup'):
+        obj.setup(*args)
+    func = getattr(obj, mname)
+    timer = timeit.Timer(lambda: func(*args))
+    try:
+        number, _elapsed = timer.autorange()
+        return min(timer.repeat(repeat=repeat, number=number))/number
+    finally:
+        if hasattr(obj, 'teardown'):
+            obj.teardown(*args)
+
+def _commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=_HERE,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _last_run(path):
+    if not os.path.exists(path):
+        return None
+    last = None
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                last = line
+    return json.loads(last) if last else None
+
+def main(argv=None):
+    '''Command line entry point.'''
+    parser = argparse.ArgumentParser(
+        description=__doc__.split('\n')[0])
+    parser.add_argument('-k', dest='pattern', default=None,
+                        help='only run benchmarks matching regex')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument(
+        '--output', default=os.path.join(_HERE, 'history.jsonl'),
+        help='history file to append to')
+    parser.add_argument('--compare', action='store_true',
+                        help='show ratio to the previous run')
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args(argv)
+
+    previous = {}
+    if args.compare:
+        last = _last_run(args.output) or {}
+        previous = {
+            (r0['name'], tuple(r0['params'])): r0['seconds']
+            for r0 in last.get('results', [])}
+
+    results = []
+    for name, obj, mname, params in _benchmarks(args.pattern):
+        sec = _time(obj, mname, params, args.repeat)
+        results.append(
+            {'name': name, 'params': list(params), 'seconds': sec})
+        line = '%-52s %-22s %10.2f us' % (
+            name, ','.join(map(str, params)), sec*1e6)
+        old = previous.get((name, tuple(params)))
+        if old:
+            line += '  x%.2f' % (sec/old)
+        print(line)
+
+    if not args.no_save:
+        record = {
+            'commit': _commit(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'machine': platform.node(),
+            'python': platform.python_version(),
+            'results': results,
+        }
+        with open(args.output, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+if __name__ == '__main__':
+    main()
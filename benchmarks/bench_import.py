@@ -0,0 +1,23 @@
+'''Time importing the package in a fresh interpreter.'''
+
+import os
+import subprocess
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TimeImport(object):
+    '''Cold start of a short-lived process, interpreter included.
+
+    'numpy' is the floor every entry point pays; the difference to
+    it is the cost of the package itself.
+    '''
+
+    params = [
+        'numpy', 'inplacetuning', 'inplacetuning.table',
+        'scipy.optimize']
+    param_names = ['module']
+
+    def time_import(self, module):
+        subprocess.check_call(
+            [sys.executable, '-c', 'import %s' % module], cwd=_ROOT)
@@ -0,0 +1,54 @@
+'''Time interval lookups over a small chord corpus.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_intervals
+
+or as part of the suite with ``python -m benchmarks``.  The
+"rebuild" timing reproduces the previous behaviour of
+constructing the full interval dict on every lookup.
+'''
+
+from itertools import permutations
+from timeit import repeat
+
+from utils import _name_to_inverval
+from utils.utils import _NOTE_INDEX
+
+CHORDS = [
+    ['c', 'e', 'g'], ['d', 'f', 'a', 'c'], ['e', 'g', 'b'],
+    ['f', 'a', 'c', 'e'], ['g', 'b', 'd', 'f'], ['b', 'd', 'f'],
+    ['c#', 'e#', 'g#'], ['eb', 'g', 'bb', 'db'], ['ab', 'c', 'eb'],
+]
+PAIRS = [p for c in CHORDS for p in permutations(c, 2)]
+
+# Same number of entries as the old hand-written dict literal
+_LEGACY_ITEMS = [
+    ((n0, n1), _name_to_inverval((n0, n1)))
+    for n0 in _NOTE_INDEX for n1 in _NOTE_INDEX
+    if n0.count('b') < 3 and n1.count('#') < 4][:534]
+
+def _rebuild_lookup(pair):
+    '''Build a pair->name dict each call, as the old table did.'''
+    return dict(_LEGACY_ITEMS).get(pair)
+
+class TimeIntervals(object):
+    '''Interval name lookups.'''
+
+    def time_name_to_interval(self):
+        '''All ordered pairs of the corpus.'''
+        for p0 in PAIRS:
+            _name_to_inverval(p0)
+
+def _time(func, number):
+    best = min(repeat(
+        lambda: [func(p) for p in PAIRS], number=number, repeat=5))
+    return best/(number*len(PAIRS))
+
+if __name__ == '__main__':
+    t_new = _time(_name_to_inverval, 2000)
+    t_old = _time(_rebuild_lookup, 50)
+    print('pairs per run: %d' % len(PAIRS))
+    print('compiled table: %8.3f us/lookup' % (t_new*1e6))
+    print('per-call dict:  %8.3f us/lookup' % (t_old*1e6))
+    print('speedup:        %8.1fx' % (t_old/t_new))
@@ -0,0 +1,23 @@
+'''Time rendering a tuned chord.'''
+
+import numpy as np
+
+from inplacetuning.synth import render
+
+RATE = 44100
+FREQS = [524.4, 655.5, 786.6]
+
+class TimeSynth(object):
+    '''Two seconds of a triad.'''
+
+    params = [1, 2]
+    param_names = ['seconds']
+
+    def time_render_blocks(self, sec):
+        for _block in render([(FREQS, sec)], rate=RATE):
+            pass
+
+    def time_render_example(self, sec):
+        '''Full-length sines as in the original example.'''
+        t = np.linspace(0, sec, int(RATE*sec), endpoint=False)
+        np.mean([np.sin(t*f*2*np.pi) for f in FREQS], axis=0)
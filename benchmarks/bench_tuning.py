@@ -0,0 +1,100 @@
+'''Time chord tuning and its pairwise ratio helpers.'''
+
+import numpy as np
+
+from inplacetuning import inplacetuning, TuningCache
+from inplacetuning.ensemble import tune_ensemble
+from inplacetuning.progression import tune_progression
+from inplacetuning.shared import SharedTuningCache
+from inplacetuning.inplacetuning import combinations, _get_ratios
+
+# Twelve distinct note names with starting frequencies
+NOTES = [
+    'c', 'e', 'g', 'b', 'd', 'f#', 'a', 'c#', 'f', 'ab', 'eb', 'bb']
+SIZES = list(range(2, 13))
+
+class TimeInplacetuning(object):
+    '''Tune one chord by size and solver.'''
+
+    params = (SIZES, ['L-BFGS-B', 'least_squares', 'log-lstsq'])
+    param_names = ['notes', 'method']
+
+    def setup(self, num, method):
+        self.chord = NOTES[:num]
+        self.method = method
+
+    def time_inplacetuning(self, num, method):
+        inplacetuning(self.chord, method=method)
+
+class TimePairs(object):
+    '''Pair construction and ratio evaluation by size.'''
+
+    params = SIZES
+    param_names = ['notes']
+
+    def setup(self, num):
+        self.chord = NOTES[:num]
+        self.freqs = np.linspace(440, 880, num)
+
+    def time_combinations(self, num):
+        list(combinations(self.chord))
+
+    def time_get_ratios(self, num):
+        _get_ratios(self.freqs)
+
+class TimeEnsemble(object):
+    '''Large chords of MIDI keys by number of voices.'''
+
+    params = ([25, 50, 100], ['nearest', 'consonant'])
+    param_names = ['voices', 'pairs']
+
+    def setup(self, num, pairs):
+        # Open C major voicing repeated over the keyboard
+        voicing = np.array([36, 43, 48, 52, 55, 60, 64, 67, 72, 76])
+        self.keys = np.resize(voicing, num)
+        self.pairs = pairs
+
+    def time_tune_ensemble(self, num, pairs):
+        tune_ensemble(self.keys, pairs=self.pairs)
+
+class TimeProgression(object):
+    '''Joint tuning of a repeated comma pump by length.'''
+
+    params = [100, 1000, 10000]
+    param_names = ['chords']
+
+    def setup(self, num):
+        pump = [
+            ['c', 'e', 'g'], ['c', 'f', 'a'], ['d', 'f', 'a'],
+            ['d', 'g', 'b']]
+        self.chords = (pump*(num//4 + 1))[:num]
+
+    def time_tune_progression(self, num):
+        tune_progression(self.chords)
+
+class TimeCache(object):
+    '''Cache hits of a transposed triad, private and shared.'''
+
+    params = ['private', 'shared']
+    param_names = ['cache']
+
+    def setup(self, kind):
+        self.writer = None
+        if kind == 'private':
+            self.cache = TuningCache()
+        else:
+            self.writer = SharedTuningCache(create=True)
+            self.cache = SharedTuningCache(self.writer.name)
+            self.writer.publish([['c', 'e', 'g']], method='log-lstsq')
+        inplacetuning(
+            ['c', 'e', 'g'], method='log-lstsq', cache=self.cache)
+
+    def teardown(self, kind):
+        if self.writer is not None:
+            self.cache.close()
+            self.writer.close()
+            self.writer.unlink()
+
+    def time_hit(self, kind):
+        inplacetuning(
+            ['c#', 'e#', 'g#'], method='log-lstsq', cache=self.cache)
@@ -1,8 +1,8 @@
 '''Basic usage of inplace tuning.'''
 
-import numpy as np
-from scipy.io.wavfile import write
 from inplacetuning import inplacetuning
+from inplacetuning.synth import render
+from inplacetuning.wavfile import WavWriter
 
 if __name__ == '__main__':
 
@@ -27,14 +27,12 @@ if __name__ == '__main__':
         print('    ropt:', ropt)
         print('   rinit:', rinit)
 
-    # make a sum of sines wave
+    # make a sum of sines wave, equal tempered then optimized
     rate = 44100
     sec = 2
-    t = np.linspace(0, sec, int(rate*sec), endpoint=False)
-    res = []
+    chords = []
     for fo, fe in zip(freqs_opt, freqs_eq):
-        sine_opt = np.mean([np.sin(t*f*2*np.pi) for f in fo], axis=0)
-        sine_eq = np.mean([np.sin(t*f*2*np.pi) for f in fe], axis=0)
-        res.append(np.concatenate((sine_eq, sine_opt)))
-
-    write('test.wav', rate=rate, data=np.concatenate(res))
+        chords += [(fe, sec), (fo, sec)]
+    with WavWriter('test.wav', rate=rate) as wav:
+        for block in render(chords, rate=rate):
+            wav.write(block)
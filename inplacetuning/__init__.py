@@ -1,3 +1,10 @@
 '''Import to top level.'''
 
 from .inplacetuning import inplacetuning
+from .batch import inplacetuning_batch
+from .ensemble import tune_ensemble
+from .progression import tune_progression
+from .cache import TuningCache
+from .result import TuningResult
+from .tuner import Tuner
+from .stats import TuningStats
@@ -0,0 +1,5 @@
+'''Run the command line tuner, see ``inplacetuning.cli``.'''
+
+from .cli import main
+
+main()
@@ -0,0 +1,164 @@
+'''Tune many chords at once.
+
+Chords of different sizes are packed into padded arrays so that
+desired ratios, starting frequencies and the solve itself are
+computed for the whole stack with array operations.
+'''
+
+import numpy as np
+
+from .inplacetuning import (
+    _FREQ_TABLE, _lower_first, _octave_ratios, _pair_indices)
+from .notes import _is_names, as_codes, frequencies
+from .semantics import ratio_table
+
+def _stacked_ratios(freqs, rows, idx0, idx1):
+    '''Ratio (larger over smaller) of each pair of each chord.'''
+    f0, f1 = freqs[rows, idx0], freqs[rows, idx1]
+    return np.maximum(f0, f1)/np.minimum(f0, f1)
+
+def inplacetuning_batch(
+        chords, method='log-lstsq', errors='raise', reference=440.0,
+        semantics='just', temperament=None):
+    '''Optimize the frequencies of many chords at once.
+
+    Parameters
+    ----------
+    chords : list
+        Each entry holds the notes sounding concurrently in any
+        form accepted by ``inplacetuning``.  Chords may have
+        different numbers of notes.
+    method : {'log-lstsq'}, optional
+        Solver used for the whole stack.  Only the closed-form
+        log-domain solver is vectorized over chords.
+    errors : {'raise', 'nan'}, optional
+        What to do with chords containing an interval or note
+        without a defined ratio: raise a ValueError, or fill their
+        rows with NaN.
+    reference : float, optional
+        Frequency of A4 in Hz the equal temperment start is built
+        from.
+    semantics : str, dict or array_like, optional
+        Ratio meant by each interval, see ``inplacetuning``.
+    temperament : array_like, optional
+        Cents from equal temperment of each pitch class of the
+        start, see ``inplacetuning``.
+
+    Returns
+    -------
+    freq_opt : array_like
+        Optimized frequencies, shape (num_chords, max_notes).
+    freq_init : array_like
+        Equal temperment frequencies, same shape as freq_opt.
+    ratio_opt : array_like
+        Ratios of optimized frequencies, shape
+        (num_chords, max_pairs).
+    ratio_desired : array_like
+        Desired ratios between pairwise notes, same shape as
+        ratio_opt.
+    ratio_init : array_like
+        Ratios of equal temperment frequencies, same shape as
+        ratio_opt.
+    cost : array_like
+        Norm of the ratio residuals of each chord.
+
+    Notes
+    -----
+    Rows are padded with NaN past the number of notes (or pairs)
+    of each chord.  Row ``k`` matches
+    ``inplacetuning(chords[k], method='log-lstsq')`` with the same
+    reference, semantics and temperament.
+    '''
+
+    # Sanity checks
+    assert isinstance(chords, list), 'Must have a list of chords!'
+    if method != 'log-lstsq':
+        raise ValueError('Unknown method "%s"!' % method)
+    if errors not in ('raise', 'nan'):
+        raise ValueError('Unknown errors "%s"!' % errors)
+    lengths = np.array([len(c0) for c0 in chords], dtype=int)
+    assert lengths.size and lengths.min() > 0, 'Empty chord given!'
+    chord_codes = [as_codes(c0) for c0 in chords]
+    table = ratio_table(semantics)
+
+    # Note codes of each chord, padded to the largest chord
+    num_chords, num_notes = lengths.size, lengths.max()
+    note_mask = np.arange(num_notes) < lengths[:, None]
+    codes = np.zeros((num_chords, num_notes), dtype=int)
+    codes[note_mask] = np.concatenate(chord_codes)
+
+    # Pair indices of each chord: the pairs of the largest chord
+    # with both notes in the chord, moved to the front in the same
+    # order as for the chord alone, then padding with note 0
+    tri0, tri1 = _pair_indices(num_notes)
+    num_pairs = tri0.size
+    order = np.argsort(
+        tri1 >= lengths[:, None], axis=1, kind='stable')
+    pair_mask = tri1[order] < lengths[:, None]
+    idx0 = np.where(pair_mask, tri0[order], 0)
+    idx1 = np.where(pair_mask, tri1[order], 0)
+    rows = np.arange(num_chords)[:, None]
+
+    # Starting frequencies by table lookup, except for chords given
+    # with octaves or in another temperament
+    freq_init = np.where(
+        note_mask, _FREQ_TABLE[codes]*(reference/440), 1)
+    for kk, c0 in enumerate(chords):
+        if temperament is not None or not _is_names(c0):
+            freq_init[kk, :lengths[kk]] = frequencies(
+                c0, reference, temperament, codes=chord_codes[kk])
+
+    # Lower note of each pair first, as for a single chord
+    idx0, idx1 = _lower_first(
+        idx0, idx1, freq_init[rows, idx0], freq_init[rows, idx1],
+        codes[rows, idx0], codes[rows, idx1])
+
+    # Desired ratios by table lookup, in the octaves spanned by the
+    # starting frequencies
+    ratio_desired = np.where(
+        pair_mask,
+        _octave_ratios(
+            table[codes[rows, idx0], codes[rows, idx1]],
+            freq_init[rows, idx0], freq_init[rows, idx1]), 1)
+    bad = np.isnan(ratio_desired).any(axis=1)
+    if bad.any() and errors == 'raise':
+        raise ValueError(
+            'No tuning defined for chords %s!' % np.flatnonzero(bad))
+    ratio_desired[bad] = 1
+    freq_init[bad] = 1
+
+    # Log-domain constraint matrices for every chord: +1 on the
+    # upper note of each pair and -1 on the lower
+    up = freq_init[rows, idx1] >= freq_init[rows, idx0]
+    hi, lo = np.where(up, idx1, idx0), np.where(up, idx0, idx1)
+    A = np.zeros((num_chords, num_pairs, num_notes))
+    pairs = np.arange(num_pairs)[None, :]
+    weight = pair_mask.astype(float)
+    A[rows, pairs, hi] = weight
+    A[rows, pairs, lo] -= weight
+
+    # Minimum-norm log-frequency update for the whole stack
+    x0 = np.log(freq_init)
+    err = np.log(ratio_desired) - np.einsum('bpn,bn->bp', A, x0)
+    x = x0 + np.einsum('bnp,bp->bn', np.linalg.pinv(A), err)
+    freq_opt = np.exp(x)
+
+    ratio_opt = _stacked_ratios(freq_opt, rows, idx0, idx1)
+    ratio_init = _stacked_ratios(freq_init, rows, idx0, idx1)
+    err = np.where(pair_mask, ratio_opt - ratio_desired, 0)
+    cost = np.sqrt(np.sum(err**2, axis=1))
+
+    # Pad unused entries with NaN
+    note_mask[bad] = False
+    pair_mask[bad] = False
+    cost[bad] = np.nan
+    for arr, mask in (
+            (freq_opt, note_mask), (freq_init, note_mask),
+            (ratio_opt, pair_mask), (ratio_desired, pair_mask),
+            (ratio_init, pair_mask)):
+        arr[~mask] = np.nan
+
+    return(
+        freq_opt, freq_init,
+        ratio_opt, ratio_desired, ratio_init,
+        cost)
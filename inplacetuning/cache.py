@@ -0,0 +1,62 @@
+'''Least recently used cache of tuning solutions.'''
+
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple(
+    'CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+class TuningCache(object):
+    '''Least recently used cache of tuning solutions.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Number of chord shapes to keep.  The least recently used
+        entry is evicted once the cache is full.
+
+    Notes
+    -----
+    Pass an instance as the ``cache`` argument of
+    ``inplacetuning``.  Keys describe the chord shape independent
+    of transposition, so e.g. C-E-G and F#-A#-C# share one entry.
+    Use ``info()`` to read the hit and miss counters when sizing
+    the cache for a repertoire.
+    '''
+
+    def __init__(self, maxsize=1024):
+        assert maxsize > 0, 'maxsize must be positive!'
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        '''Return the cached value for key or None.'''
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        '''Store value under key, evicting the oldest entry.'''
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def info(self):
+        '''Hit and miss counters and current size.'''
+        return CacheInfo(
+            self.hits, self.misses, self.maxsize, len(self._data))
+
+    def clear(self):
+        '''Drop all entries and reset the counters.'''
+        self._data.clear()
+        self.hits = self.misses = 0
@@ -0,0 +1,217 @@
+'''Tune chords from the command line.
+
+Reads one chord per line from files or stdin and writes one result
+per line, in input order, as soon as it is available::
+
+    echo '["c", "e", "g"]' | python -m inplacetuning
+    python -m inplacetuning -f csv -t csv chords.csv > tuned.csv
+
+JSON-lines input holds a list of notes, or an object with a
+``notes`` list, per line.  CSV input holds the notes of a chord as
+the fields of a row.  Notes are names or MIDI key numbers.
+
+JSON-lines output holds ``notes``, ``freqs``, ``cents`` (offsets
+from equal temperment) and ``cost``, or ``error`` for chords that
+cannot be tuned.  CSV output rows are the space-separated notes,
+the cost and the frequencies; untunable chords have an empty cost
+and the error message.  Lines that cannot be parsed are echoed as
+they are in place of the notes.
+
+Lines are tuned in chunks by worker processes with only a few
+chunks in flight at once, so memory use does not grow with the
+input.
+'''
+
+import argparse
+import csv
+import fileinput
+import io
+import json
+import os
+import sys
+from collections import deque
+from itertools import islice
+
+import numpy as np
+
+from .cache import TuningCache
+from .inplacetuning import inplacetuning
+
+# Solvers of inplacetuning
+_METHODS = ('L-BFGS-B', 'least_squares', 'log-lstsq')
+
+# Per-process state set up by _init_worker()
+_WORKER = {}
+
+def _init_worker(method, reference, informat, outformat, cache_size):
+    _WORKER.update(
+        method=method, reference=reference, informat=informat,
+        outformat=outformat,
+        cache=TuningCache(cache_size) if cache_size else None)
+
+def _note(field):
+    field = field.strip()
+    return int(field) if field.lstrip('-').isdigit() else field
+
+def _parse(line, informat):
+    '''Notes of one input line.'''
+    if informat == 'csv':
+        fields = next(csv.reader([line]))
+        return [_note(f0) for f0 in fields if f0.strip()]
+    chord = json.loads(line)
+    if isinstance(chord, dict):
+        chord = chord['notes']
+    return [_note(n0) if isinstance(n0, str) else n0 for n0 in chord]
+
+def _format(notes, freqs, cents, cost, error, outformat):
+    '''One output line.
+
+    notes is the raw line when it could not be parsed.
+    '''
+    if outformat == 'csv':
+        buf = io.StringIO()
+        chord = notes
+        if not isinstance(notes, str):
+            chord = ' '.join(map(str, notes))
+        if error is not None:
+            row = [chord, '', error]
+        else:
+            row = [chord, '%.6g' % cost] + [
+                '%.4f' % f0 for f0 in freqs]
+        csv.writer(buf, lineterminator='\n').writerow(row)
+        return buf.getvalue()
+    if error is not None:
+        out = {'notes': notes, 'error': error}
+    else:
+        out = {
+            'notes': notes, 'freqs': freqs.tolist(),
+            'cents': np.round(cents, 4).tolist(), 'cost': float(cost)}
+    return json.dumps(out) + '\n'
+
+def _tune_line(line):
+    '''Output line for one input line.'''
+    notes = line.strip()
+    try:
+        notes = _parse(line, _WORKER['informat'])
+        res = inplacetuning(
+            notes, method=_WORKER['method'], cache=_WORKER['cache'],
+            reference=_WORKER['reference'])
+    except (AssertionError, KeyError, ValueError, TypeError) as e:
+        return _format(
+            notes, None, None, None, str(e) or type(e).__name__,
+            _WORKER['outformat'])
+    return _format(
+        notes, res.freq_opt, res.cents, res.cost, None,
+        _WORKER['outformat'])
+
+def _tune_lines(lines):
+    return ''.join([_tune_line(l0) for l0 in lines])
+
+def _chunks(lines, chunksize):
+    '''Non-blank lines in lists of chunksize.'''
+    lines = (l0 for l0 in lines if l0.strip())
+    while True:
+        chunk = list(islice(lines, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+def tune_stream(
+        lines, out, method='log-lstsq', reference=440.0,
+        informat='jsonl', outformat='jsonl', max_workers=None,
+        chunksize=256, cache_size=1024):
+    '''Tune chords read from lines and write results to out.
+
+    Parameters
+    ----------
+    lines : iterable of str
+        One chord per line; blank lines are skipped.
+    out : file-like
+        Where the result lines are written, in input order.
+    method : str, optional
+        Solver passed to ``inplacetuning``.
+    reference : float, optional
+        Frequency of A4 in Hz.
+    informat, outformat : {'jsonl', 'csv'}, optional
+        Line formats, see the module docstring.
+    max_workers : int, optional
+        Worker processes, all available cores by default.  With 1
+        the chords are tuned in this process.
+    chunksize : int, optional
+        Lines sent to a worker at a time.
+    cache_size : int, optional
+        Size of the ``TuningCache`` kept by each worker, or 0 to
+        disable caching.
+
+    Notes
+    -----
+    At most two chunks per worker are read ahead of the output, so
+    memory use is bounded by the chunk size, not the input size.
+    '''
+    from .parallel import _num_workers
+    if method not in _METHODS:
+        raise ValueError('Unknown method "%s"!' % method)
+    for fmt in (informat, outformat):
+        if fmt not in ('jsonl', 'csv'):
+            raise ValueError('Unknown format "%s"!' % fmt)
+    initargs = (method, reference, informat, outformat, cache_size)
+    workers = _num_workers(max_workers)
+    if workers == 1:
+        _init_worker(*initargs)
+        for chunk in _chunks(lines, chunksize):
+            out.write(_tune_lines(chunk))
+            out.flush()
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    pending = deque()
+    with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=initargs) as pool:
+        for chunk in _chunks(lines, chunksize):
+            pending.append(pool.submit(_tune_lines, chunk))
+            if len(pending) >= 2*workers:
+                out.write(pending.popleft().result())
+                out.flush()
+        while pending:
+            out.write(pending.popleft().result())
+            out.flush()
+
+def main(argv=None, out=None):
+    '''Command line entry point.'''
+    parser = argparse.ArgumentParser(
+        prog='python -m inplacetuning',
+        description='Tune chords, one per line.')
+    parser.add_argument(
+        'files', nargs='*', default=['-'],
+        help='input files, stdin by default or for "-"')
+    parser.add_argument(
+        '-f', '--from', dest='informat', default='jsonl',
+        choices=['jsonl', 'csv'], help='input format')
+    parser.add_argument(
+        '-t', '--to', dest='outformat', default='jsonl',
+        choices=['jsonl', 'csv'], help='output format')
+    parser.add_argument(
+        '-m', '--method', default='log-lstsq', choices=_METHODS,
+        help='solver')
+    parser.add_argument(
+        '-r', '--reference', type=float, default=440.0,
+        help='frequency of A4 in Hz')
+    parser.add_argument(
+        '-j', '--workers', type=int, default=None,
+        help='worker processes, all cores by default')
+    parser.add_argument('--chunksize', type=int, default=256)
+    args = parser.parse_args(argv)
+
+    try:
+        with fileinput.input(args.files) as lines:
+            tune_stream(
+                lines, sys.stdout if out is None else out,
+                method=args.method, reference=args.reference,
+                informat=args.informat, outformat=args.outformat,
+                max_workers=args.workers, chunksize=args.chunksize)
+    except BrokenPipeError:
+        # Downstream stopped reading, e.g. piped into head; keep the
+        # interpreter from complaining while flushing at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
@@ -0,0 +1,183 @@
+'''Tuning of large ensembles.
+
+Fitting every pair of a 100-voice sonority is both slow and
+musically meaningless: nobody hears the interval between the
+contrabass and the piccolo.  Here only musically relevant pairs are
+kept, each pair is weighted by the consonance of its interval, and
+the log-frequency least-squares problem is built as a sparse matrix.
+Notes that are not linked through any kept pair form independent
+groups, and each group is solved on its own.
+'''
+
+from fractions import Fraction
+
+import numpy as np
+
+from .inplacetuning import _RATIO_TABLE, _octave_ratios, _ratios
+from .notes import as_codes, frequencies
+
+def _build_heights():
+    '''Tenney height log2(n*d) of the ratio of every note pair.'''
+    values, inverse = np.unique(_RATIO_TABLE, return_inverse=True)
+    heights = np.full(values.size, np.nan)
+    for ii, v0 in enumerate(values):
+        if not np.isnan(v0):
+            f0 = Fraction(float(v0)).limit_denominator(1 << 30)
+            heights[ii] = np.log2(f0.numerator*f0.denominator)
+    return heights[inverse].reshape(_RATIO_TABLE.shape)
+
+_HEIGHT_TABLE = _build_heights()
+
+def ensemble_pairs(
+        notes, pairs='nearest', neighbours=2, max_height=5.5):
+    '''Musically relevant pairs of a large chord.
+
+    Parameters
+    ----------
+    notes : list of str, array_like of NOTE_DTYPE or of int
+        Notes sounding concurrently, in any form accepted by
+        ``inplacetuning``.  Structured notes and MIDI keys keep
+        their octave.
+    pairs : {'nearest', 'consonant'}, optional
+        'nearest' pairs every note with the next ``neighbours``
+        notes above it in pitch.  'consonant' keeps every pair
+        whose interval, reduced to within an octave, has a Tenney
+        height of at most ``max_height``.
+    neighbours : int, optional
+        Neighbours of each note for 'nearest'.
+    max_height : float, optional
+        Largest Tenney height log2(n*d) for 'consonant'.  The
+        default keeps unisons, octaves, fifths, fourths, thirds and
+        sixths.
+
+    Returns
+    -------
+    idx0, idx1 : array_like
+        Indices of the lower and upper note of each pair.
+    ratio_desired : array_like
+        Desired ratio of each pair, octaves included.
+    weights : array_like
+        Weight of each pair, 1/(1 + height), so consonances pull
+        harder than dissonances.
+    freq_init : array_like
+        Equal temperment frequencies.
+
+    Notes
+    -----
+    Pairs whose interval has no defined ratio are dropped.
+    '''
+    codes = as_codes(notes)
+    freq_init = frequencies(notes, codes=codes)
+
+    # Candidate pairs, lower note first
+    order = np.argsort(freq_init, kind='stable')
+    num = order.size
+    if pairs == 'nearest':
+        steps = np.arange(1, neighbours + 1)
+        start = np.arange(num)[:, None]
+        keep = start + steps < num
+        idx0 = order[np.broadcast_to(start, keep.shape)[keep]]
+        idx1 = order[(start + steps)[keep]]
+    elif pairs == 'consonant':
+        tri0, tri1 = np.triu_indices(num, 1)
+        idx0, idx1 = order[tri0], order[tri1]
+    else:
+        raise ValueError('Unknown pairs "%s"!' % pairs)
+
+    # Simple interval of each pair, raised by the octaves between
+    # the two notes
+    simple = _RATIO_TABLE[codes[idx0], codes[idx1]]
+    height = _HEIGHT_TABLE[codes[idx0], codes[idx1]]
+    keep = ~np.isnan(simple)
+    if pairs == 'consonant':
+        keep &= height <= max_height
+    idx0, idx1 = idx0[keep], idx1[keep]
+    simple, height = simple[keep], height[keep]
+    ratio_desired = _octave_ratios(
+        simple, freq_init[idx0], freq_init[idx1])
+    weights = 1/(1 + height)
+    return idx0, idx1, ratio_desired, weights, freq_init
+
+def tune_ensemble(
+        notes, pairs='nearest', neighbours=2, max_height=5.5):
+    '''Optimize the frequencies of a large chord.
+
+    Parameters
+    ----------
+    notes : list of str, array_like of NOTE_DTYPE or of int
+        Notes sounding concurrently, see ``ensemble_pairs``.
+    pairs : {'nearest', 'consonant'}, optional
+        Which pairs to fit, see ``ensemble_pairs``.
+    neighbours : int, optional
+        Neighbours of each note for 'nearest'.
+    max_height : float, optional
+        Largest Tenney height for 'consonant'.
+
+    Returns
+    -------
+    freq_opt : array_like
+        Optimized frequencies.
+    freq_init : array_like
+        Equal temperment frequencies.
+    ratio_opt : array_like
+        Ratios of optimized frequencies of the kept pairs.
+    ratio_desired : array_like
+        Desired ratios of the kept pairs.
+    ratio_init : array_like
+        Ratios of equal temperment frequencies of the kept pairs.
+    cost
+        Norm of the ratio residuals of the kept pairs.
+
+    Notes
+    -----
+    The weighted least-squares problem in log-frequency is solved
+    through its sparse normal equations, each group of notes
+    linked by kept pairs on its own, giving the smallest change
+    from equal temperment.  Notes without any kept pair are left
+    at their starting frequency.  Work grows with the number of kept
+    pairs, linearly in the number of voices for 'nearest'.
+    '''
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+    from scipy.sparse.linalg import spsolve
+
+    idx0, idx1, ratio_desired, weights, freq_init = ensemble_pairs(
+        notes, pairs, neighbours, max_height)
+    num_notes, num_pairs = freq_init.size, idx0.size
+
+    # Weighted log-domain constraints: +w on the upper note of each
+    # pair and -w on the lower
+    rows = np.repeat(np.arange(num_pairs), 2)
+    cols = np.stack((idx1, idx0), axis=1).reshape(-1)
+    vals = np.stack((weights, -weights), axis=1).reshape(-1)
+    A = csr_matrix(
+        (vals, (rows, cols)), shape=(num_pairs, num_notes))
+    x0 = np.log(freq_init)
+    err = weights*np.log(ratio_desired) - A @ x0
+
+    # Groups of linked notes are independent.  Within a group only
+    # the log-frequency differences are fixed, so hold the first
+    # note of every group in place, solve the sparse normal
+    # equations for the rest and then shift each group to the
+    # smallest change from equal temperment
+    links = csr_matrix(
+        (np.ones(num_pairs), (idx0, idx1)),
+        shape=(num_notes, num_notes))
+    _num, labels = connected_components(links, directed=False)
+    free = np.ones(num_notes, dtype=bool)
+    free[np.unique(labels, return_index=True)[1]] = False
+    step = np.zeros(num_notes)
+    if free.any():
+        lap = (A.T @ A).tocsr()[free][:, free]
+        step[free] = spsolve(lap.tocsc(), (A.T @ err)[free])
+    step -= (np.bincount(labels, step)/np.bincount(labels))[labels]
+    x = x0 + step
+    freq_opt = np.exp(x)
+
+    ratio_opt = _ratios(freq_opt, idx0, idx1)
+    ratio_init = _ratios(freq_init, idx0, idx1)
+    cost = np.linalg.norm(ratio_opt - ratio_desired)
+    return(
+        freq_opt, freq_init,
+        ratio_opt, ratio_desired, ratio_init,
+        cost)
@@ -9,49 +9,367 @@ References
 .. [5] https://www.musictheory.net/calculators/interval
 '''
 
-from collections import OrderedDict
+from collections import deque
+from fractions import Fraction
+from functools import lru_cache
 
 import numpy as np
-from scipy.optimize import minimize
 
-from utils import _name_to_inverval
+from .notes import _NAME_FREQS, as_codes, frequencies
+from .result import TuningResult
+from .semantics import _RATIO_TABLES, ratio_table
+
+# Starting frequencies for notes (equal temperment, A4 = 440 Hz)
+# and just pair ratio lookups by note code
+_FREQ_TABLE = _NAME_FREQS
+_RATIO_TABLE = _RATIO_TABLES['just']
+
+@lru_cache(maxsize=None)
+def _pair_indices(num_notes):
+    '''Indices of every pair of notes, in upper triangle order.'''
+    idx0, idx1 = np.triu_indices(num_notes, 1)
+    idx0.flags.writeable = False
+    idx1.flags.writeable = False
+    return idx0, idx1
 
 def combinations(x):
-    '''Pairwise combinations in predictable order.'''
+    '''Pairwise combinations in predictable order.
+
+    Every entry is paired with every later entry by position, so
+    repeated entries each keep their own pairs.
+    '''
+    idx0, idx1 = _pair_indices(len(x))
+    return [(x[i0], x[i1]) for i0, i1 in zip(idx0, idx1)]
 
-    pairs = OrderedDict()
-    for x0 in x:
-        for x1 in x:
-            pairs[x1] = x0
-            pairs[x0] = x1
-    return zip(pairs.keys(), pairs.values())
+def _ratios(freqs, idx0, idx1):
+    '''Vectorized ratio (larger over smaller) for each pair.'''
+    f0, f1 = freqs[idx0], freqs[idx1]
+    return np.maximum(f0, f1)/np.minimum(f0, f1)
 
 def _get_ratios(freqs):
     '''Get ratio between frequencies.'''
-    return [np.max(f0)/np.min(f0) for f0 in combinations(freqs)]
+    freqs = np.asarray(freqs, dtype=float)
+    return _ratios(freqs, *_pair_indices(freqs.size))
+
+def _ratio_jacobian(freqs, idx0, idx1):
+    '''Jacobian of _ratios() with respect to the frequencies.
+
+    For each pair r = hi/lo, so dr/dhi = 1/lo and
+    dr/dlo = -hi/lo**2.  Pairs of a note with itself would have
+    zero derivative since both terms cancel.
+    '''
+    f0, f1 = freqs[idx0], freqs[idx1]
+    up = f1 >= f0
+    hi, lo = np.where(up, f1, f0), np.where(up, f0, f1)
+    rows = np.arange(idx0.size)
+    jac = np.zeros((idx0.size, freqs.size))
+    jac[rows, np.where(up, idx1, idx0)] = 1/lo
+    jac[rows, np.where(up, idx0, idx1)] -= hi/lo**2
+    return jac
+
+@lru_cache(maxsize=1024)
+def _log_pinv(num_notes, hi, lo):
+    '''Cached pseudo-inverse of the log-domain pair constraints.
+
+    Row k of the constraint matrix has +1 at hi[k] and -1 at lo[k]
+    so that (A @ log(freqs))[k] = log(ratio[k]).
+    '''
+    A = np.zeros((len(hi), num_notes))
+    rows = np.arange(len(hi))
+    np.add.at(A, (rows, list(hi)), 1)
+    np.add.at(A, (rows, list(lo)), -1)
+    pinv = np.linalg.pinv(A)
+    pinv.flags.writeable = False
+    return A, pinv
+
+def _solve_log_lstsq(freq_init, idx0, idx1, ratio_desired):
+    '''Closest log-frequencies to freq_init fitting the ratios.
+
+    Which note of each pair is the upper one is taken from
+    freq_init.  The minimum-norm change of log-frequencies that
+    best satisfies the pair constraints in the least-squares sense
+    is x0 + pinv(A) @ (b - A @ x0).
+    '''
+    up = freq_init[idx1] >= freq_init[idx0]
+    hi = tuple(np.where(up, idx1, idx0).tolist())
+    lo = tuple(np.where(up, idx0, idx1).tolist())
+    A, pinv = _log_pinv(freq_init.size, hi, lo)
+    x0 = np.log(freq_init)
+    return np.exp(x0 + pinv @ (np.log(ratio_desired) - A @ x0))
+
+# Primes exact ratios are factored over
+_PRIMES = (2, 3, 5, 7)
+_LOG_PRIMES = np.log(_PRIMES)
 
-def inplacetuning(notes):
+@lru_cache(maxsize=4096)
+def _monzo(ratio):
+    '''Prime exponents of a ratio, None if it has other factors.
+
+    Floats are read as the exact dyadic fraction they hold or as
+    the simplest fraction with a moderate denominator that rounds
+    to them, so e.g. 16/9 is recognized.
+    '''
+    frac = Fraction(ratio)
+    for f0 in (frac, frac.limit_denominator(1 << 24)):
+        if float(f0) != ratio:
+            continue
+        num, den, out = f0.numerator, f0.denominator, []
+        for p0 in _PRIMES:
+            e0 = 0
+            while num % p0 == 0:
+                num, e0 = num//p0, e0 + 1
+            while den % p0 == 0:
+                den, e0 = den//p0, e0 - 1
+            out.append(e0)
+        if num == den == 1:
+            return tuple(out)
+    return None
+
+def _solve_exact(freq_init, idx0, idx1, ratio_desired):
+    '''Exact tuning of a chord without a comma, else None.
+
+    Every pair asks the upper note (by freq_init) to sit a ratio
+    above the lower one.  The ratios are propagated as prime
+    exponent vectors (monzos) along a spanning tree of the pairs;
+    if every remaining pair agrees exactly the chord is consistent
+    and has a zero-cost tuning.  Each linked group of notes is
+    then shifted to the smallest change in cents from freq_init,
+    the same answer 'log-lstsq' gives.  Chords with a comma or a
+    ratio that is not a product of small primes return None.
+    '''
+    up = freq_init[idx1] >= freq_init[idx0]
+    hi = np.where(up, idx1, idx0).tolist()
+    lo = np.where(up, idx0, idx1).tolist()
+    links = [[] for _ in range(freq_init.size)]
+    for h0, l0, r0 in zip(hi, lo, ratio_desired.tolist()):
+        m0 = _monzo(r0)
+        if m0 is None:
+            return None
+        links[l0].append((h0, m0, 1))
+        links[h0].append((l0, m0, -1))
+
+    # Breadth first from the first note of each group, checking
+    # every pair against the exponents already assigned
+    monzos = [None]*freq_init.size
+    groups = np.empty(freq_init.size, dtype=int)
+    num_groups = 0
+    for root in range(freq_init.size):
+        if monzos[root] is not None:
+            continue
+        monzos[root] = (0,)*len(_PRIMES)
+        groups[root] = num_groups
+        num_groups += 1
+        todo = deque([root])
+        while todo:
+            n0 = todo.popleft()
+            for n1, m0, sign in links[n0]:
+                m1 = tuple([
+                    a0 + sign*b0 for a0, b0 in zip(monzos[n0], m0)])
+                if monzos[n1] is None:
+                    monzos[n1] = m1
+                    groups[n1] = groups[n0]
+                    todo.append(n1)
+                elif monzos[n1] != m1:
+                    return None
+
+    x0 = np.log(freq_init)
+    x = np.array(monzos, dtype=float) @ _LOG_PRIMES
+    shift = np.bincount(groups, x0 - x)/np.bincount(groups)
+    return np.exp(x + shift[groups])
+
+def _octave_ratios(simple, f0, f1):
+    '''Desired ratio (larger over smaller) of each pair.
+
+    simple is the ratio of the interval from the note starting at
+    f0 up to the note starting at f1 by name.  It is moved by whole
+    octaves to lie nearest to f1/f0, so e.g. D above C by name but
+    started below it aims for a major second down rather than a
+    minor seventh up.
+    '''
+    ratio = f1/f0
+    ratio = simple*2**np.round(np.log2(ratio/simple))
+    return np.maximum(ratio, 1/ratio)
+
+def _lower_first(idx0, idx1, f0, f1, c0, c1):
+    '''Pair indices with the lower note of each pair first.
+
+    Notes are ordered by starting frequency, then by code, so the
+    interval of a pair is read the same way whatever order the
+    notes are given in.
+    '''
+    down = (f0 > f1) | ((f0 == f1) & (c0 > c1))
+    return np.where(down, idx1, idx0), np.where(down, idx0, idx1)
+
+def _problem(codes, stats=None, freq_init=None, semantics='just'):
+    '''Pair indices, desired ratios and starting frequencies.
+
+    Starting frequencies default to the nominal octave of each
+    note name.  Every pair of notes is fit, lower note first, so
+    the problem does not depend on the order of the notes.
+    '''
+    if freq_init is None:
+        freq_init = _FREQ_TABLE[codes]
+
+    # Get all pairwise relationships we need to optimize over
+    idx0, idx1 = _pair_indices(codes.size)
+    idx0, idx1 = _lower_first(
+        idx0, idx1, freq_init[idx0], freq_init[idx1],
+        codes[idx0], codes[idx1])
+    if stats is not None:
+        stats.mark('pairs')
+
+    # Get desired ratios according to semantics, from the lower
+    # note of each pair up to the upper one
+    table = ratio_table(semantics)
+    ratio_desired = table[codes[idx0], codes[idx1]]
+    if np.isnan(ratio_desired).any():
+        raise KeyError('No ratio defined for an interval!')
+    if stats is not None:
+        stats.mark('intervals')
+
+    # Place each interval in the octaves the starting frequencies
+    # (equal temperment) span
+    ratio_desired = _octave_ratios(
+        ratio_desired, freq_init[idx0], freq_init[idx1])
+    if stats is not None:
+        stats.mark('freqs')
+    return idx0, idx1, ratio_desired, freq_init
+
+def _solve(freq_init, idx0, idx1, ratio_desired, method, stats=None):
+    '''Fit frequencies to the desired ratios of each pair.'''
+
+    # Modify freqs to minize difference between ratios and
+    # semantically desired ratios
+    def _resid(x):
+        return _ratios(x, idx0, idx1) - ratio_desired
+
+    def _jac(x):
+        return _ratio_jacobian(x, idx0, idx1)
+
+    def _obj(x):
+        err = _resid(x)
+        nrm = np.linalg.norm(err)
+        if nrm == 0:
+            return nrm, np.zeros(x.size)
+        return nrm, _jac(x).T @ err/nrm
+
+    # Chords without a comma are tuned exactly without iterating
+    if method in ('L-BFGS-B', 'least_squares'):
+        freq_opt = _solve_exact(freq_init, idx0, idx1, ratio_desired)
+        if freq_opt is not None:
+            if stats is not None:
+                stats.record({'message': 'Exact solution.'})
+            return freq_opt, np.linalg.norm(_resid(freq_opt))
+
+    # Do the thing (SciPy is only imported by the iterative solvers
+    # so that closed-form and table lookups start quickly):
+    if method == 'L-BFGS-B':
+        from scipy.optimize import minimize
+        res = minimize(
+            _obj,
+            freq_init,
+            jac=True,
+            method='L-BFGS-B',
+            bounds=[(1, np.inf)]*len(freq_init))
+        freq_opt, cost = res['x'], res['fun']
+    elif method == 'least_squares':
+        from scipy.optimize import least_squares
+        res = least_squares(
+            _resid, freq_init, jac=_jac, bounds=(1, np.inf))
+        freq_opt = res['x']
+        cost = np.linalg.norm(res['fun'])
+    elif method == 'log-lstsq':
+        freq_opt = _solve_log_lstsq(
+            freq_init, idx0, idx1, ratio_desired)
+        cost = np.linalg.norm(_resid(freq_opt))
+        res = {'message': 'Closed-form solution.'}
+    else:
+        raise ValueError('Unknown method "%s"!' % method)
+    if stats is not None:
+        stats.record(res)
+    return freq_opt, cost
+
+def _shape_key(method, idx0, idx1, ratio_desired, freq_init, codes):
+    '''Cache key shared by transpositions of the same chord.
+
+    The ratio problem only depends on the desired ratios and the
+    starting frequencies relative to the lowest note (here rounded
+    to a tenth of a cent).  Notes are put in a canonical order, by
+    starting frequency then code as pairs are oriented, so the key
+    does not depend on the order of the notes either.  Also returns
+    that order, in which cached values are stored.
+    '''
+    order = np.lexsort((codes, freq_init))
+    rank = np.empty_like(order)
+    rank[order] = np.arange(order.size)
+    pairs = np.lexsort((rank[idx1], rank[idx0]))
+    freqs = freq_init[order]
+    cents = np.round(1200*np.log2(freqs/freqs[0]), 1)
+    key = (method, ratio_desired[pairs].tobytes(), cents.tobytes())
+    return key, order
+
+def inplacetuning(
+        notes, method='L-BFGS-B', cache=None, stats=None,
+        reference=440.0, semantics='just', temperament=None):
     '''Given a set of notes, return optimized frequencies.
 
     Parameters
     ----------
-    notes : list of str
-        Note names sounding concurrently.
+    notes : list of str, array_like of NOTE_DTYPE or of int
+        Notes sounding concurrently: names, structured notes (see
+        ``inplacetuning.notes``) or MIDI key numbers.  Structured
+        and MIDI notes skip string parsing; MIDI keys are spelled
+        together as one chord.
+    method : {'L-BFGS-B', 'least_squares', 'log-lstsq'}, optional
+        Solver used to fit the ratios.  'L-BFGS-B' minimizes the
+        norm of the ratio residuals with ``scipy.optimize.minimize``
+        and 'least_squares' uses ``scipy.optimize.least_squares``.
+        Both use the analytic Jacobian of the residuals and only
+        run for chords whose pairs contain a comma; chords whose
+        ratios all agree are tuned exactly without iterating.
+        'log-lstsq' solves the linear least-squares problem in
+        log-frequency directly with a cached pseudo-inverse; the
+        fit is then in cents rather than in ratios, and SciPy is
+        never imported.
+    cache : TuningCache, optional
+        Cache of solutions shared between transpositions of the
+        same chord shape.  A hit is rescaled to the frequency of the
+        first note instead of being solved again.
+    stats : TuningStats, optional
+        Filled in with the wall time of each stage and the solver's
+        evaluation and iteration counts and convergence status.
+    reference : float, optional
+        Frequency of A4 in Hz the equal temperment start is built
+        from, e.g. 415 or 442.
+    semantics : str, dict or array_like, optional
+        Ratio meant by each interval: 'just' (5-limit), '7-limit',
+        'pythagorean', a dict of ratios by interval name or a table
+        from ``inplacetuning.semantics.ratio_table``.
+    temperament : array_like, optional
+        Deviation in cents from equal temperment of each pitch
+        class of the start, beginning at C, e.g. a meantone or
+        well temperament.  Twelve-tone equal temperment by default.
 
     Returns
     -------
-    freq_opt : list
-        Optimized frequencies to preserve "just" intonation.
-    freq_init : list
-        Equal temperment frequencies.
-    ratio_opt : list
-        Ratios of optimized frequencies.
-    ratio_desired : list
-        Desired ratios between pairwise notes.
-    ratio_init : list
-        Ratios of equal temperment frequencies.
-    cost
-        Final objective function evaluation.
+    TuningResult
+        Unpacks, like a tuple, into:
+
+        freq_opt : array_like
+            Optimized frequencies to preserve "just" intonation.
+        freq_init : array_like
+            Starting frequencies, equal temperment by default.
+        ratio_opt : array_like
+            Ratios of optimized frequencies.
+        ratio_desired : array_like
+            Desired ratios between pairwise notes.
+        ratio_init : array_like
+            Ratios of equal temperment frequencies.
+        cost
+            Final objective function evaluation.
+
+        The ratios of the optimized and equal temperment
+        frequencies are only computed when accessed.
 
     Notes
     -----
@@ -60,140 +378,59 @@ def inplacetuning(notes):
     set of notes provided irrespective of unsupplied notes, hence
     the frequency optimization happens "in-place."
 
-    The optimization starts with equal-tempered frequencies and
-    ends with frequencies that satisfy the conditions of just
-    intonation frequency ratios.
+    The optimization starts with equal-tempered frequencies (or
+    those of the given temperament) and ends with frequencies that
+    satisfy the conditions of just intonation frequency ratios.
+    Structured notes and MIDI keys start in their own octave and
+    note names in the octave from A4 up to G#5; desired ratios span
+    the same octaves as the starting frequencies.
     '''
 
+    if stats is not None:
+        stats.start()
+
     # Sanity checks
-    assert isinstance(notes, list), 'Must have a list of notes!'
-
-    # Make sure notes provided are valid
-    _notenames = [
-        'a', 'a#', 'a##', 'ab', 'abb',
-        'b', 'b#', 'b##', 'bb', 'bbb',
-        'c', 'c#', 'c##', 'cb', 'cbb',
-        'd', 'd#', 'd##', 'db', 'dbb',
-        'e', 'e#', 'e##', 'eb', 'ebb',
-        'f', 'f#', 'f##', 'fb', 'fbb',
-        'g', 'g#', 'g##', 'gb', 'gbb'
-    ]
-    assert all([n0 in _notenames for n0 in notes]), (
-        'Invalid note name provided!')
+    assert isinstance(notes, (list, np.ndarray)), (
+        'Must have a list of notes!')
+    assert len(notes) > 0, 'Must have at least one note!'
 
-    # Get all pairwise relationships we need to optimize over
-    # notes = sorted(notes) # rest of code assumes lexigraphic order
-    pairs = combinations(notes)
-
-    # Define what we "mean" when we say [interval type] between two
-    # notes. I'll call this the "semantics" of the note group
-    _semantics = {
-        'P1': 1, # unison
-        'A1': 25/24, # augmented unison
-        'AA1': 1125/1024, # double augmented unison
-        'dd2': 135/128, # double dimished second (maybe?)
-        'd2': 128/125, # dimished second
-        'm2': 16/15, # minor second
-        'M2': 9/8, # major second
-        'A2': 75/64, # augmented second
-        'AA2': 10125/8192, # doubly augmented second
-        'dd3': 2048/1875, # doubly dimished third
-        'd3': 144/125, # dimished third
-        'm3': 6/5, # minor third
-        'M3': 5/4, # major third
-        'A3': 125/96, # Augmented third
-        'AA3': 5625/4096, # double augmented third
-        'dd4': 4096/3375, # doubly dimished fourth
-        'd4': 32/25, # dimished fourth
-        'P4': 4/3, # perfect fourth
-        'A4': 45/32, # augmented fourth
-        'AA4': 375/256, # double augmented fourth
-        'AAA4': 8/5, # triply augmented fourth (copy m6?)
-        'ddd5': 5/4, # triply dimished fifth (copy M3?)
-        'dd5': 512/375, # doubly dimished fifth
-        'd5': 25/18, # dimished fifth
-        'P5': 3/2, # perfect fifth
-        'A5': 25/16, # augmented fifth
-        'AA5': 3375/2048, # double augmented fifth
-        'dd6': 8192/5625, # doubly dimished sixth
-        'd6': 192/125, # dimished sixth
-        'm6': 8/5, # minor sixth
-        'M6': 5/3, # major sixth
-        'A6': 125/72, # augmented sixth
-        'AA6': 1875/1024, # double augmented sixth
-        'dd7': 16384/10125, # doubly dimished seventh
-        'd7': 128/75, # dimished seventh
-        'm7': 16/9, # minor seventh
-        'M7': 15/8, # major seventh
-        'A7': 125/64, # augmented seventh
-        'AA7': 1162261467/536870912, # double augmented seventh (Pyth)
-        'dd8': 2048/1125, # doubly dimished octave
-        'd8': 48/25, # dimished octave
-        'P8': 2, # octave
-    }
-
-    # Get desired ratios according to semantics
-    ratio_desired = np.array(
-        [_semantics[_name_to_inverval(p0)] for p0 in pairs])
-
-    # Get starting frequencies for notes (equal temperment)
-    _nominal_freqs = {
-        'abb': 783.99,
-        'ab': 415.30,
-        'a': 440,
-        'a#': 466.16,
-        'a##': 493.88,
-        'bbb': 440,
-        'bb': 466.16,
-        'b': 493.88,
-        'b#': 523.25,
-        'b##': 554.37,
-        'cb': 493.88,
-        'c': 523.25,
-        'c#': 554.37,
-        'c##': 587.33,
-        'dbb': 523.25,
-        'db': 554.37,
-        'd': 587.33,
-        'd#': 622.25,
-        'd##': 659.25,
-        'ebb': 587.33,
-        'eb': 622.25,
-        'e': 659.25,
-        'e#': 698.46,
-        'e##': 739.99,
-        'fb': 659.25,
-        'f': 698.46,
-        'f#': 739.99,
-        'f##': 783.99,
-        'gb': 739.99,
-        'g': 783.99,
-        'g#': 830.61,
-        'g##': 440,
-    }
-    freq_init = [_nominal_freqs[n0] for n0 in notes]
-    ratio_init = _get_ratios(freq_init)
+    # Make sure notes provided are valid and get their codes and
+    # starting frequencies
+    codes = as_codes(notes)
+    freq_init = frequencies(
+        notes, reference, temperament, codes=codes)
+    if stats is not None:
+        stats.mark('validate')
 
-    # Modify freqs to minize difference between ratios and
-    # semantically desired ratios
-    def _obj(x, ratio_desired):
-        freq_ratios = _get_ratios(x) # all pairwise combinations
-        return np.linalg.norm(freq_ratios - ratio_desired)
-
-    # Do the thing:
-    res = minimize(
-        _obj,
-        freq_init,
-        bounds=[(1, np.inf)]*len(freq_init),
-        args=(ratio_desired,))
-    freq_opt, cost = res['x'], res['fun']
-    ratio_opt = _get_ratios(freq_opt)
+    # Pairs, desired ratios and equal temperment start
+    idx0, idx1, ratio_desired, freq_init = _problem(
+        codes, stats, freq_init, semantics)
+
+    # Reuse the solution of a transposed chord of the same shape
+    key = hit = None
+    if cache is not None:
+        key, order = _shape_key(
+            method, idx0, idx1, ratio_desired, freq_init, codes)
+        hit = cache.get(key)
+        if stats is not None:
+            stats.cache_hit = hit is not None
+            stats.mark('cache')
+    if hit is not None:
+        freq_opt = np.empty_like(freq_init)
+        freq_opt[order] = hit[0]*freq_init[order[0]]
+        cost = hit[1]
+    else:
+        freq_opt, cost = _solve(
+            freq_init, idx0, idx1, ratio_desired, method, stats)
+        if cache is not None:
+            cache.put(
+                key, (freq_opt[order]/freq_init[order[0]], cost))
+        if stats is not None:
+            stats.mark('solve')
 
     # Return interesting outputs
-    return(
-        freq_opt, freq_init,
-        ratio_opt, ratio_desired, ratio_init,
-        cost)
+    return TuningResult(
+        freq_opt, freq_init, idx0, idx1, ratio_desired, cost)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,241 @@
+'''Retune Standard MIDI Files.
+
+Tracks are read event by event straight from the file, one open
+handle per track, and merged by time so that notes sounding
+together across tracks form one chord.  Every time the set of
+sounding keys changes the chord is tuned with ``inplacetuning``.
+
+The output is a copy of the input file with one extra track of
+MIDI Tuning Standard real-time single note tuning changes that
+retune the sounding keys.  Input tracks are copied in blocks and
+the tuning track is written as it is produced, so memory use per
+file does not depend on its length.
+'''
+
+import heapq
+import struct
+
+import numpy as np
+
+from .inplacetuning import inplacetuning
+
+# Bytes following a channel status byte (without running status)
+_DATA_LEN = {
+    0x80: 2, 0x90: 2, 0xA0: 2, 0xB0: 2,
+    0xC0: 1, 0xD0: 1, 0xE0: 2,
+}
+
+_COPY_BLOCK = 1 << 16
+
+def _read_vlq(f):
+    '''Read a variable-length quantity.'''
+    value = 0
+    while True:
+        b0 = f.read(1)
+        if not b0:
+            raise ValueError('Unexpected end of MIDI file!')
+        value = (value << 7) | (b0[0] & 0x7F)
+        if not b0[0] & 0x80:
+            return value
+
+def _write_vlq(value):
+    '''Encode a variable-length quantity.'''
+    out = [value & 0x7F]
+    value >>= 7
+    while value:
+        out.append(0x80 | (value & 0x7F))
+        value >>= 7
+    return bytes(reversed(out))
+
+def _chunks(f):
+    '''Yield (type, data offset, length) for each chunk.'''
+    while True:
+        head = f.read(8)
+        if len(head) < 8:
+            return
+        kind, length = struct.unpack('>4sI', head)
+        offset = f.tell()
+        yield kind, offset, length
+        f.seek(offset + length)
+
+def _read_header(f):
+    '''Return (format, number of tracks, division).'''
+    kind, length = struct.unpack('>4sI', f.read(8))
+    if kind != b'MThd' or length < 6:
+        raise ValueError('Not a Standard MIDI File!')
+    fmt, ntrks, division = struct.unpack('>HHH', f.read(6))
+    f.seek(8 + length)
+    return fmt, ntrks, division
+
+def _iter_notes(path, offset, length):
+    '''Stream (tick, key, on) note events of one track.'''
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        end = offset + length
+        tick, status = 0, None
+        while f.tell() < end:
+            tick += _read_vlq(f)
+            b0 = f.read(1)[0]
+            # Meta and sysex events cancel running status
+            if b0 == 0xFF:
+                f.read(1)
+                f.seek(_read_vlq(f), 1)
+                status = None
+                continue
+            if b0 in (0xF0, 0xF7):
+                f.seek(_read_vlq(f), 1)
+                status = None
+                continue
+            if b0 & 0x80:
+                status = b0
+                data = f.read(_DATA_LEN[status & 0xF0])
+            elif status is None:
+                raise ValueError('Running status without status!')
+            else:
+                data = bytes([b0]) + f.read(
+                    _DATA_LEN[status & 0xF0] - 1)
+            kind = status & 0xF0
+            if kind == 0x90 and data[1]:
+                yield tick, data[0], True
+            elif kind in (0x80, 0x90):
+                yield tick, data[0], False
+
+def iter_sounding_sets(path):
+    '''Yield (tick, keys) whenever the set of sounding keys changes.
+
+    Parameters
+    ----------
+    path : str
+        Standard MIDI File to read.
+
+    Yields
+    ------
+    tick : int
+        Time of the change in ticks from the start of the file.
+    keys : tuple of int
+        Sorted MIDI key numbers sounding after all events at tick.
+    '''
+    with open(path, 'rb') as f:
+        _read_header(f)
+        tracks = [
+            (off, ln) for kind, off, ln in _chunks(f)
+            if kind == b'MTrk']
+    events = heapq.merge(
+        *[_iter_notes(path, off, ln) for off, ln in tracks],
+        key=lambda ev: ev[0])
+
+    counts = {}
+    last, tick = (), None
+    for t0, key, on in events:
+        if tick is not None and t0 != tick:
+            keys = tuple(sorted(counts))
+            if keys != last:
+                yield tick, keys
+                last = keys
+        tick = t0
+        if on:
+            counts[key] = counts.get(key, 0) + 1
+        elif key in counts:
+            counts[key] -= 1
+            if not counts[key]:
+                del counts[key]
+    keys = tuple(sorted(counts))
+    if tick is not None and keys != last:
+        yield tick, keys
+
+def tune_keys(keys, method='log-lstsq', cache=None):
+    '''Cents offsets from equal temperment for sounding keys.
+
+    Keys are passed to ``inplacetuning`` as MIDI numbers, which
+    spells them together as a chord and starts each in its own
+    octave.
+    Since the ratios do not fix the overall pitch, offsets are
+    shifted to average zero.  Chords that cannot be tuned are left
+    in equal temperment.
+    '''
+    if len(set([k0 % 12 for k0 in keys])) < 2:
+        return np.zeros(len(keys))
+    try:
+        cents = inplacetuning(
+            list(keys), method=method, cache=cache).cents
+    except KeyError:
+        return np.zeros(len(keys))
+    return cents - np.mean(cents)
+
+def _tuning_sysex(changes, program=0):
+    '''MTS real-time single note tuning change message body.'''
+    body = bytearray([0x7F, 0x7F, 0x08, 0x02, program, len(changes)])
+    for key, cents in changes:
+        target = key + cents/100
+        semi = int(np.floor(target))
+        frac = int(round((target - semi)*16384))
+        if frac == 16384:
+            semi, frac = semi + 1, 0
+        semi = min(max(semi, 0), 127)
+        body += bytes([key, semi, frac >> 7, frac & 0x7F])
+    body.append(0xF7)
+    return bytes(body)
+
+def retune_midi(src, dst, method='log-lstsq', cache=None, tol=0.1):
+    '''Write a copy of a MIDI file with a tuning track added.
+
+    Parameters
+    ----------
+    src : str
+        Standard MIDI File to read.
+    dst : str
+        Output file.  Input chunks are copied unchanged and a track
+        of MTS single note tuning changes is appended.  Format 0
+        files become format 1.
+    method : str, optional
+        Solver passed to ``inplacetuning``.
+    cache : TuningCache, optional
+        Cache shared between chords, and files if reused.
+    tol : float, optional
+        Keys whose tuning moves less than this many cents are not
+        sent again.
+
+    Returns
+    -------
+    int
+        Number of tuning messages written.
+    '''
+    with open(src, 'rb') as fin, open(dst, 'wb') as fout:
+        fmt, ntrks, division = _read_header(fin)
+        fout.write(b'MThd' + struct.pack(
+            '>IHHH', 6, max(fmt, 1), ntrks + 1, division))
+        for kind, offset, length in _chunks(fin):
+            fout.write(struct.pack('>4sI', kind, length))
+            fin.seek(offset)
+            remaining = length
+            while remaining:
+                block = fin.read(min(remaining, _COPY_BLOCK))
+                if not block:
+                    raise ValueError('Truncated MIDI chunk!')
+                fout.write(block)
+                remaining -= len(block)
+
+        # Tuning track, length patched once it is written
+        fout.write(b'MTrk\0\0\0\0')
+        start = fout.tell()
+        current, prev_tick, count = {}, 0, 0
+        for tick, keys in iter_sounding_sets(src):
+            cents = tune_keys(keys, method=method, cache=cache)
+            changes = [
+                (k0, c0) for k0, c0 in zip(keys, cents)
+                if abs(current.get(k0, 0) - c0) >= tol]
+            if not changes:
+                continue
+            current.update(changes)
+            # At most 127 keys fit in one message
+            for ii in range(0, len(changes), 127):
+                msg = _tuning_sysex(changes[ii:ii + 127])
+                fout.write(_write_vlq(tick - prev_tick) + b'\xF0' +
+                           _write_vlq(len(msg)) + msg)
+                prev_tick, count = tick, count + 1
+        fout.write(b'\x00\xFF\x2F\x00')
+        end = fout.tell()
+        fout.seek(start - 4)
+        fout.write(struct.pack('>I', end - start))
+        fout.seek(end)
+    return count
@@ -0,0 +1,224 @@
+'''Compact note representations.
+
+Besides lowercase names, notes can be given as a NumPy structured
+array of ``NOTE_DTYPE`` (letter index, accidental and octave, three
+bytes per note) or as MIDI key numbers.  All of them are turned
+into small integer codes, indices into the accepted note names,
+before any table lookups.
+
+Note names carry no octave.  They start from the octave window
+running from A4 up to G#5 (with spellings such as ``cb`` or
+``abb`` placed by their letter), while structured notes and MIDI
+keys start in their own octave.
+
+MIDI keys carry no spelling.  The keys of a chord are spelled
+together, keeping their notes close on the line of fifths, so e.g.
+E major gets G# (a major third) and Eb minor gets Gb (a minor
+third) rather than one fixed spelling per pitch class.
+'''
+
+import numpy as np
+
+from utils import _NOTENAMES
+
+NOTE_DTYPE = np.dtype([
+    ('letter', 'i1'),      # 0-6 for c, d, e, f, g, a, b
+    ('accidental', 'i1'),  # -2 (double flat) to 2 (double sharp)
+    ('octave', 'i1'),      # scientific pitch, middle C is C4
+])
+
+_LETTERS = 'cdefgab'
+_NATURALS = np.array([0, 2, 4, 5, 7, 9, 11])
+_MAX_ACCIDENTALS = 2
+
+# Letters in order of the line of fifths, F (-1) to B (5)
+_FIFTH_LETTERS = 'fcgdaeb'
+
+# Position of each pitch class on the circle of fifths from C
+_PC_FIFTHS = 7*np.arange(12) % 12
+
+# Line of fifths position spelled MIDI keys are kept near, the
+# middle of Ab (-4) to C# (7)
+_SPELLING_CENTER = 1.5
+
+_CODES = {n0: ii for ii, n0 in enumerate(_NOTENAMES)}
+
+def _name(letter, accidental):
+    return _LETTERS[letter] + (
+        '#'*accidental if accidental > 0 else 'b'*(-accidental))
+
+def _parse(name):
+    '''(letter, accidental) of a note name.'''
+    acc = name.count('#') - name.count('b', 1)
+    return _LETTERS.index(name[0]), acc
+
+# Code of each (letter, accidental + 2) and of each pitch class
+_LETTER_CODES = np.array([
+    [_CODES[_name(ll, aa)]
+     for aa in range(-_MAX_ACCIDENTALS, _MAX_ACCIDENTALS + 1)]
+    for ll in range(7)])
+
+# Code of each line of fifths position from Fbb (-15) to B## (19)
+_MIN_FIFTHS = -1 - 7*_MAX_ACCIDENTALS
+_FIFTH_CODES = np.array([
+    _CODES[_name(
+        _LETTERS.index(_FIFTH_LETTERS[(p0 + 1) % 7]), (p0 + 1)//7)]
+    for p0 in range(_MIN_FIFTHS, 6 + 7*_MAX_ACCIDENTALS)])
+
+def _spell(keys):
+    '''Codes of MIDI keys spelled together as one chord.
+
+    The pitch classes are placed on the shortest arc of the circle
+    of fifths holding them all, which is then unrolled onto the
+    line of fifths as near to ``_SPELLING_CENTER`` as possible.  A
+    single key gets the spelling of the Ab to C# window.
+    '''
+    fifths = _PC_FIFTHS[np.asarray(keys, dtype=int) % 12]
+    if not fifths.size:
+        return np.zeros(0, dtype=int)
+    present = np.unique(fifths)
+    gaps = np.diff(np.append(present, present[0] + 12))
+    start = present[(np.argmax(gaps) + 1) % present.size]
+    pos = (fifths - start) % 12 + start
+    mean = np.mean((present - start) % 12 + start)
+    pos += 12*int(np.round((_SPELLING_CENTER - mean)/12))
+    return _FIFTH_CODES[pos - _MIN_FIFTHS]
+
+def _name_key(name):
+    '''MIDI key of a note name in the A4 to G#5 window.'''
+    letter, acc = _parse(name)
+    octave = 4 if _LETTERS[letter] in 'ab' else 5
+    return 12*(octave + 1) + _NATURALS[letter] + acc
+
+# MIDI key and A=440 equal temperment frequency of each note code
+_NAME_KEYS = np.array([_name_key(n0) for n0 in _NOTENAMES])
+_NAME_FREQS = 440*2**((_NAME_KEYS - 69)/12)
+_NAME_FREQS.flags.writeable = False
+
+def encode(names, octave=4):
+    '''Structured notes from names.
+
+    Parameters
+    ----------
+    names : list of str
+        Note names accepted by ``inplacetuning``.
+    octave : int or array_like, optional
+        Octave of every note, or of each note.
+
+    Returns
+    -------
+    array_like
+        Array of ``NOTE_DTYPE``.
+    '''
+    assert all([n0 in _CODES for n0 in names]), (
+        'Invalid note name provided!')
+    out = np.zeros(len(names), dtype=NOTE_DTYPE)
+    parsed = [_parse(n0) for n0 in names]
+    out['letter'] = [p0[0] for p0 in parsed]
+    out['accidental'] = [p0[1] for p0 in parsed]
+    out['octave'] = octave
+    return out
+
+def from_midi(keys):
+    '''Structured notes spelled from the MIDI keys of a chord.'''
+    keys = np.asarray(keys, dtype=int)
+    out = np.zeros(keys.size, dtype=NOTE_DTYPE)
+    parsed = [_parse(_NOTENAMES[c0]) for c0 in _spell(keys)]
+    out['letter'] = [p0[0] for p0 in parsed]
+    out['accidental'] = [p0[1] for p0 in parsed]
+    out['octave'] = (keys - out['accidental'])//12 - 1
+    return out
+
+def to_midi(notes):
+    '''MIDI key numbers of structured notes.'''
+    return (12*(notes['octave'].astype(int) + 1) +
+            _NATURALS[notes['letter']] + notes['accidental'])
+
+def to_names(notes):
+    '''Note names of structured notes.'''
+    return [
+        _name(int(l0), int(a0))
+        for l0, a0 in zip(notes['letter'], notes['accidental'])]
+
+def as_codes(notes):
+    '''Integer codes of notes in any accepted representation.
+
+    Parameters
+    ----------
+    notes : list of str, array_like of NOTE_DTYPE or of int
+        Note names, structured notes or MIDI key numbers.  MIDI
+        keys are spelled together as one chord.
+
+    Returns
+    -------
+    array_like
+        Indices into the accepted note names.
+    '''
+    if isinstance(notes, np.ndarray) and notes.dtype.kind in 'US':
+        notes = notes.astype(str).tolist()
+    if isinstance(notes, np.ndarray):
+        if notes.dtype == NOTE_DTYPE:
+            letter, acc = notes['letter'], notes['accidental']
+            assert np.all(np.abs(acc) <= _MAX_ACCIDENTALS), (
+                'Invalid note provided!')
+            return _LETTER_CODES[letter, acc + _MAX_ACCIDENTALS]
+        assert notes.dtype.kind in 'iu', 'Invalid notes provided!'
+        return _spell(notes)
+    try:
+        return np.array([_CODES[n0] for n0 in notes], dtype=int)
+    except (KeyError, TypeError):
+        pass
+    assert all([isinstance(n0, (int, np.integer)) for n0 in notes]), (
+        'Invalid note name provided!')
+    return _spell(notes)
+
+def _is_names(notes):
+    '''Whether notes are given by name rather than with octaves.'''
+    if isinstance(notes, np.ndarray):
+        return notes.dtype.kind in 'US'
+    return not len(notes) or isinstance(notes[0], str)
+
+def to_keys(notes, codes=None):
+    '''MIDI key numbers of notes in any accepted representation.
+
+    Note names are placed in the A4 to G#5 window.  Pass the codes
+    from ``as_codes`` when they are already known.
+    '''
+    if isinstance(notes, np.ndarray) and notes.dtype == NOTE_DTYPE:
+        return to_midi(notes)
+    if not _is_names(notes):
+        return np.asarray(notes, dtype=int)
+    if codes is None:
+        codes = as_codes(notes)
+    return _NAME_KEYS[codes]
+
+def frequencies(notes, reference=440.0, temperament=None, codes=None):
+    '''Nominal starting frequencies of notes.
+
+    Parameters
+    ----------
+    notes : list of str, array_like of NOTE_DTYPE or of int
+        Note names, structured notes or MIDI key numbers.
+    reference : float, optional
+        Frequency of A4 in Hz, e.g. 415 or 442.
+    temperament : array_like, optional
+        Deviation in cents from equal temperment of each pitch
+        class, starting at C.  Twelve-tone equal temperment by
+        default.
+    codes : array_like, optional
+        Codes from ``as_codes`` when they are already known.
+
+    Returns
+    -------
+    array_like
+        Frequency of each note in Hz.
+    '''
+    if temperament is None and _is_names(notes):
+        if codes is None:
+            codes = as_codes(notes)
+        return _NAME_FREQS[codes]*(reference/440)
+    keys = to_keys(notes, codes)
+    steps = keys - 69.0
+    if temperament is not None:
+        steps += np.asarray(temperament, dtype=float)[keys % 12]/100
+    return reference*2**(steps/12)
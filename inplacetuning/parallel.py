@@ -0,0 +1,108 @@
+'''Tune large corpora across worker processes.'''
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import TuningCache
+from .inplacetuning import inplacetuning
+from .midi import retune_midi
+
+# Per-process state set up by _init_worker()
+_WORKER = {}
+
+def _init_worker(method, cache_size):
+    '''Remember the solver and give each worker its own cache.'''
+    _WORKER['method'] = method
+    _WORKER['cache'] = TuningCache(cache_size) if cache_size else None
+
+def _tune_one(notes):
+    return inplacetuning(
+        notes, method=_WORKER['method'], cache=_WORKER['cache'])
+
+def _retune_one(paths):
+    return retune_midi(
+        paths[0], paths[1],
+        method=_WORKER['method'], cache=_WORKER['cache'])
+
+def _num_workers(max_workers):
+    '''Default to the cores this process may run on.'''
+    if max_workers:
+        return max_workers
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def _chunksize(num_items, num_workers):
+    '''A few chunks per worker keeps IPC small and load balanced.'''
+    return max(1, num_items//(4*num_workers))
+
+def _run(func, items, method, max_workers, chunksize, cache_size):
+    items = list(items)
+    workers = _num_workers(max_workers)
+    if chunksize is None:
+        chunksize = _chunksize(len(items), workers)
+    with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(method, cache_size)) as pool:
+        return list(pool.map(func, items, chunksize=chunksize))
+
+def tune_chords(
+        chords, method='L-BFGS-B', max_workers=None, chunksize=None,
+        cache_size=1024):
+    '''Run ``inplacetuning`` on many chords in parallel.
+
+    Parameters
+    ----------
+    chords : iterable of list of str
+        Chords to tune.
+    method : str, optional
+        Solver passed to ``inplacetuning``.
+    max_workers : int, optional
+        Number of worker processes.  Defaults to the number of
+        cores available to this process.
+    chunksize : int, optional
+        Chords sent to a worker at a time.  Defaults to about four
+        chunks per worker.
+    cache_size : int, optional
+        Size of the ``TuningCache`` kept by each worker, or 0 to
+        disable caching.
+
+    Returns
+    -------
+    list of tuple
+        Output of ``inplacetuning`` for each chord in input order.
+    '''
+    return _run(
+        _tune_one, chords, method, max_workers, chunksize, cache_size)
+
+def retune_midi_files(
+        paths, method='log-lstsq', max_workers=None, chunksize=1,
+        cache_size=1024):
+    '''Run ``retune_midi`` on many files in parallel.
+
+    Parameters
+    ----------
+    paths : iterable of (str, str)
+        (source, destination) file names.
+    method : str, optional
+        Solver passed to ``inplacetuning``.
+    max_workers : int, optional
+        Number of worker processes.  Defaults to the number of
+        cores available to this process.
+    chunksize : int, optional
+        Files sent to a worker at a time.
+    cache_size : int, optional
+        Size of the ``TuningCache`` kept by each worker, or 0 to
+        disable caching.
+
+    Returns
+    -------
+    list of int
+        Number of tuning messages written for each file, in input
+        order.
+    '''
+    return _run(
+        _retune_one, paths, method, max_workers, chunksize,
+        cache_size)
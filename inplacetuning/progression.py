@@ -0,0 +1,137 @@
+'''Joint tuning of a whole chord progression.
+
+Tuning every chord on its own makes held and repeated notes jump by
+a comma whenever the next chord wants them somewhere else.  Here
+all chords of a piece are tuned together in one sparse weighted
+least-squares problem in log-frequency:
+
+- within each chord, the pair ratios of ``inplacetuning``
+- between consecutive chords, every common tone (same key, by its
+  equal temperment pitch) is asked to keep its frequency
+- the mean pitch of every chord is pulled towards equal
+  temperment, so the piece as a whole cannot drift away (e.g. by a
+  comma per cycle of a comma pump)
+
+Each chord only couples to its neighbours, so the normal equations
+are banded and one sparse factorization solves the whole piece.
+'''
+
+import numpy as np
+
+from .inplacetuning import _problem, _ratios
+from .notes import as_codes, frequencies
+
+def tune_progression(
+        chords, continuity=1.0, anchor=0.5, reference=440.0,
+        temperament=None):
+    '''Optimize the frequencies of a sequence of chords jointly.
+
+    Parameters
+    ----------
+    chords : list
+        Sounding notes of each chord in any form accepted by
+        ``inplacetuning``, in playing order.
+    continuity : float, optional
+        Weight of keeping a common tone of consecutive chords at the
+        same frequency, relative to the pair ratios in a chord.  0
+        tunes the chords independently.
+    anchor : float, optional
+        Weight pulling the mean log-frequency of every chord
+        towards equal temperment; keeps the overall pitch from
+        drifting over a long piece.  It does not bend the
+        intervals within a chord.
+    reference : float, optional
+        Frequency of A4 in Hz.
+    temperament : array_like, optional
+        Cents from equal temperment of each pitch class of the
+        start, see ``inplacetuning``.  The anchor then pulls
+        towards this temperament.
+
+    Returns
+    -------
+    freq_opt : list of array_like
+        Optimized frequencies of each chord.
+    freq_init : list of array_like
+        Starting frequencies of each chord.
+    cost : array_like
+        Norm of the pair ratio residuals of each chord.
+
+    Notes
+    -----
+    Pair ratios are fit in cents like the 'log-lstsq' method of
+    ``inplacetuning``.  Chords containing an interval without a
+    defined ratio raise KeyError.
+    '''
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.linalg import spsolve
+
+    assert isinstance(chords, list) and chords, (
+        'Must have a list of chords!')
+    assert anchor > 0, 'anchor must be positive!'
+
+    # Pair constraints within each chord, on global note indices
+    starts, his, los, logr, weights, problems = [], [], [], [], [], []
+    offset = 0
+    for chord in chords:
+        codes = as_codes(chord)
+        freq_init = frequencies(
+            chord, reference, temperament, codes=codes)
+        idx0, idx1, ratio_desired, freq_init = _problem(
+            codes, freq_init=freq_init)
+        problems.append((idx0, idx1, ratio_desired))
+
+        # Pairs come lower note first
+        his.append(offset + idx1)
+        los.append(offset + idx0)
+        logr.append(np.log(ratio_desired))
+        weights.append(np.ones(idx0.size))
+        starts.append(freq_init)
+        offset += freq_init.size
+    num_notes = offset
+    bounds = np.cumsum([0] + [f0.size for f0 in starts])
+
+    # Common tones of consecutive chords stay put
+    if continuity:
+        cents = [np.round(1200*np.log2(f0)).astype(int)
+                 for f0 in starts]
+        for kk in range(1, len(chords)):
+            _common, prev, cur = np.intersect1d(
+                cents[kk - 1], cents[kk], return_indices=True)
+            his.append(bounds[kk] + cur)
+            los.append(bounds[kk - 1] + prev)
+            logr.append(np.zeros(cur.size))
+            weights.append(np.full(cur.size, float(continuity)))
+    hi, lo = np.concatenate(his), np.concatenate(los)
+    logr, weights = np.concatenate(logr), np.concatenate(weights)
+
+    # Weighted constraints: +w on the upper note and -w on the
+    # lower of each pair, then one row per chord averaging its notes
+    num_pairs = hi.size
+    sizes = np.diff(bounds)
+    rows = np.concatenate((
+        np.repeat(np.arange(num_pairs), 2),
+        num_pairs + np.repeat(np.arange(len(chords)), sizes)))
+    cols = np.concatenate((
+        np.stack((hi, lo), axis=1).reshape(-1), np.arange(num_notes)))
+    vals = np.concatenate((
+        np.stack((weights, -weights), axis=1).reshape(-1),
+        np.repeat(anchor/sizes, sizes)))
+    A = csr_matrix(
+        (vals, (rows, cols)),
+        shape=(num_pairs + len(chords), num_notes))
+    x0 = np.log(np.concatenate(starts))
+    target = np.concatenate((weights*logr, np.zeros(len(chords))))
+    target[num_pairs:] = A[num_pairs:] @ x0
+
+    # Normal equations of the change from x0; the chord means make
+    # them nonsingular
+    x = x0 + spsolve((A.T @ A).tocsc(), A.T @ (target - A @ x0))
+    freqs = np.exp(x)
+
+    freq_opt = [
+        freqs[bounds[kk]:bounds[kk + 1]] for kk in range(len(chords))]
+    cost = np.array([
+        np.linalg.norm(_ratios(f0, idx0, idx1) - ratio_desired)
+        for f0, (idx0, idx1, ratio_desired) in zip(
+            freq_opt, problems)])
+    return freq_opt, starts, cost
@@ -0,0 +1,91 @@
+'''Result of tuning a chord.'''
+
+import numpy as np
+
+class TuningResult(object):
+    '''Optimized frequencies with diagnostics computed on demand.
+
+    Unpacks like the tuple ``inplacetuning`` used to return::
+
+        freq_opt, freq_init, ratio_opt, ratio_desired, ratio_init, \\
+            cost = inplacetuning(notes)
+
+    and supports indexing in the same order.  Hot paths that only
+    need ``freq_opt`` never compute the ratios.
+
+    Attributes
+    ----------
+    freq_opt : array_like
+        Optimized frequencies.
+    freq_init : array_like
+        Equal temperment frequencies.
+    ratio_desired : array_like
+        Desired ratios between pairwise notes.
+    cost : float
+        Final objective function evaluation.
+    '''
+
+    __slots__ = (
+        'freq_opt', 'freq_init', 'ratio_desired', 'cost', '_idx0',
+        '_idx1', '_ratio_opt', '_ratio_init')
+
+    # Order of the fields when unpacked or indexed
+    _FIELDS = (
+        'freq_opt', 'freq_init', 'ratio_opt', 'ratio_desired',
+        'ratio_init', 'cost')
+
+    def __init__(
+            self, freq_opt, freq_init, idx0, idx1, ratio_desired,
+            cost):
+        self.freq_opt = freq_opt
+        self.freq_init = freq_init
+        self.ratio_desired = ratio_desired
+        self.cost = cost
+        self._idx0 = idx0
+        self._idx1 = idx1
+        self._ratio_opt = None
+        self._ratio_init = None
+
+    @property
+    def ratio_opt(self):
+        '''Ratios of optimized frequencies.'''
+        if self._ratio_opt is None:
+            from .inplacetuning import _ratios
+            self._ratio_opt = _ratios(
+                self.freq_opt, self._idx0, self._idx1)
+        return self._ratio_opt
+
+    @property
+    def ratio_init(self):
+        '''Ratios of equal temperment frequencies.'''
+        if self._ratio_init is None:
+            from .inplacetuning import _ratios
+            self._ratio_init = _ratios(
+                self.freq_init, self._idx0, self._idx1)
+        return self._ratio_init
+
+    @property
+    def cents(self):
+        '''Offset of each note from equal temperment in cents.'''
+        return 1200*np.log2(self.freq_opt/self.freq_init)
+
+    @property
+    def cents_error(self):
+        '''Remaining error of each pair ratio in cents.'''
+        return 1200*np.log2(self.ratio_opt/self.ratio_desired)
+
+    def __len__(self):
+        return len(self._FIELDS)
+
+    def __iter__(self):
+        return (getattr(self, f0) for f0 in self._FIELDS)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(
+                getattr(self, f0) for f0 in self._FIELDS[index])
+        return getattr(self, self._FIELDS[index])
+
+    def __repr__(self):
+        return 'TuningResult(freq_opt=%s, cost=%g)' % (
+            np.array2string(self.freq_opt, precision=2), self.cost)
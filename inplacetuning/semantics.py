@@ -0,0 +1,175 @@
+'''What ratio we "mean" by each interval.
+
+Interval names are compiled once at import into small integer codes,
+one for every pair of note codes, and each semantics into an array
+of ratios indexed by interval code.  Gathering that array at the
+code table gives the ratio of every note pair, so the desired
+ratios of a chord are one fancy-indexing lookup whichever semantics
+is used.
+
+Semantics are chosen by name:
+
+- 'just': 5-limit just intonation (the default)
+- '7-limit': as 'just', but with the harmonic seventh 7/4 for
+  minor sevenths and augmented sixths and the septimal tritones 7/5
+  and 10/7
+- 'pythagorean': every interval stacked from pure fifths 3/2
+
+or given as a dict mapping interval names (e.g. 'M3') to ratios.
+'''
+
+import numpy as np
+
+from utils import _name_to_inverval, _NOTENAMES
+
+# 5-limit just intonation
+_SEMANTICS = {
+    'P1': 1, # unison
+    'A1': 25/24, # augmented unison
+    'AA1': 1125/1024, # double augmented unison
+    'dd2': 135/128, # double dimished second (maybe?)
+    'd2': 128/125, # dimished second
+    'm2': 16/15, # minor second
+    'M2': 9/8, # major second
+    'A2': 75/64, # augmented second
+    'AA2': 10125/8192, # doubly augmented second
+    'dd3': 2048/1875, # doubly dimished third
+    'd3': 144/125, # dimished third
+    'm3': 6/5, # minor third
+    'M3': 5/4, # major third
+    'A3': 125/96, # Augmented third
+    'AA3': 5625/4096, # double augmented third
+    'dd4': 4096/3375, # doubly dimished fourth
+    'd4': 32/25, # dimished fourth
+    'P4': 4/3, # perfect fourth
+    'A4': 45/32, # augmented fourth
+    'AA4': 375/256, # double augmented fourth
+    'AAA4': 8/5, # triply augmented fourth (copy m6?)
+    'ddd5': 5/4, # triply dimished fifth (copy M3?)
+    'dd5': 512/375, # doubly dimished fifth
+    'd5': 25/18, # dimished fifth
+    'P5': 3/2, # perfect fifth
+    'A5': 25/16, # augmented fifth
+    'AA5': 3375/2048, # double augmented fifth
+    'dd6': 8192/5625, # doubly dimished sixth
+    'd6': 192/125, # dimished sixth
+    'm6': 8/5, # minor sixth
+    'M6': 5/3, # major sixth
+    'A6': 125/72, # augmented sixth
+    'AA6': 1875/1024, # double augmented sixth
+    'dd7': 16384/10125, # doubly dimished seventh
+    'd7': 128/75, # dimished seventh
+    'm7': 16/9, # minor seventh
+    'M7': 15/8, # major seventh
+    'A7': 125/64, # augmented seventh
+    'AA7': 1162261467/536870912, # double augmented seventh (Pyth)
+    'dd8': 2048/1125, # doubly dimished octave
+    'd8': 48/25, # dimished octave
+    'P8': 2, # octave
+}
+
+# Septimal intervals replacing their 5-limit counterparts
+_SEVEN_LIMIT = dict(_SEMANTICS, **{
+    'm7': 7/4, # harmonic seventh
+    'A6': 7/4, # augmented sixth
+    'd5': 7/5, # septimal tritone
+    'A4': 10/7, # septimal tritone
+})
+
+# Position of each letter on the line of fifths relative to C
+_FIFTHS = {'f': -1, 'c': 0, 'g': 1, 'd': 2, 'a': 3, 'e': 4, 'b': 5}
+
+def _fifths(name):
+    '''Pure fifths from C up to a note name.'''
+    return _FIFTHS[name[0]] + 7*(
+        name[1:].count('#') - name[1:].count('b'))
+
+def _build_codes():
+    '''Interval names and the interval code of every note pair.
+
+    Intervals with a 5-limit ratio come first, in the order they
+    are defined.  Also returns the fifths spanned by each interval.
+    '''
+    intervals = list(_SEMANTICS)
+    fifths = {}
+    codes = np.empty((len(_NOTENAMES),)*2, dtype=np.int8)
+    for ii, n0 in enumerate(_NOTENAMES):
+        for jj, n1 in enumerate(_NOTENAMES):
+            name = _name_to_inverval((n0, n1))
+            if name not in intervals:
+                intervals.append(name)
+            codes[ii, jj] = intervals.index(name)
+            fifths[name] = _fifths(n1) - _fifths(n0)
+    codes.flags.writeable = False
+    return tuple(intervals), codes, fifths
+
+_INTERVALS, _INTERVAL_CODES, _INTERVAL_FIFTHS = _build_codes()
+
+def _compile(semantics):
+    '''Ratio of each interval code; NaN where undefined.'''
+    return np.array([
+        semantics.get(name, np.nan) for name in _INTERVALS],
+                    dtype=float)
+
+def _pythagorean():
+    '''Intervals of the 5-limit semantics stacked from fifths.
+
+    Each is placed in the octave of its 5-limit ratio.
+    '''
+    out = {}
+    for name, just in _SEMANTICS.items():
+        if name not in _INTERVAL_FIFTHS:
+            continue
+        k = _INTERVAL_FIFTHS[name]
+        octaves = np.round(np.log2(just) - k*np.log2(3))
+        out[name] = 3.0**k*2.0**octaves
+    return out
+
+def _build_tables():
+    '''Note pair ratio tables of the named semantics.'''
+    tables = {}
+    for name, semantics in (
+            ('just', _SEMANTICS), ('7-limit', _SEVEN_LIMIT),
+            ('pythagorean', _pythagorean())):
+        table = _compile(semantics)[_INTERVAL_CODES]
+        table.flags.writeable = False
+        tables[name] = table
+    return tables
+
+_RATIO_TABLES = _build_tables()
+
+def ratio_table(semantics='just'):
+    '''Desired ratio of every pair of note codes.
+
+    Parameters
+    ----------
+    semantics : str, dict or array_like, optional
+        Name of built-in semantics ('just', '7-limit' or
+        'pythagorean'), a dict of ratios by interval name or a table
+        returned by this function.
+
+    Returns
+    -------
+    array_like
+        Ratio of the interval from the note with the row code up to
+        the note with the column code.  Intervals without semantics
+        are NaN.
+
+    Notes
+    -----
+    Named semantics are compiled at import.  Compile a dict once
+    with this function and pass the table around rather than the
+    dict so it is not compiled on every call.
+    '''
+    if isinstance(semantics, str):
+        try:
+            return _RATIO_TABLES[semantics]
+        except KeyError:
+            raise ValueError(
+                'Unknown semantics "%s"!' % semantics) from None
+    if isinstance(semantics, dict):
+        return _compile(semantics)[_INTERVAL_CODES]
+    semantics = np.asarray(semantics, dtype=float)
+    assert semantics.shape == _INTERVAL_CODES.shape, (
+        'Ratio table must have a row and column per note code!')
+    return semantics
@@ -0,0 +1,215 @@
+'''Serve tunings to other processes over local UDP.
+
+Clients send OSC messages whose arguments are the sounding notes,
+as names or MIDI key numbers:
+
+- ``/freqs c e g`` is answered with ``/freqs`` and the optimized
+  frequencies in Hz
+- ``/cents 60 64 67`` is answered with ``/cents`` and each note's
+  offset from equal temperment in cents
+- ``/stats`` is answered with ``/stats`` and the number of requests
+  served and the p50 and p99 latency in milliseconds
+
+Bad requests are answered with ``/error`` and a message.  Solves run
+on one worker thread so the event loop keeps reading; requests for
+the same notes that arrive while a solve is running wait for that
+solve instead of starting their own.
+
+Run a server with ``python -m inplacetuning.server``.
+'''
+
+import asyncio
+import struct
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+import numpy as np
+
+from .cache import TuningCache
+from .inplacetuning import inplacetuning
+
+def _osc_string(s):
+    '''Null terminated string padded to a multiple of 4 bytes.'''
+    data = s.encode() + b'\0'
+    return data + b'\0'*(-len(data) % 4)
+
+def osc_message(address, args=()):
+    '''Encode an OSC message of int, float and str arguments.'''
+    tags, body = ',', b''
+    for a0 in args:
+        if isinstance(a0, str):
+            tags += 's'
+            body += _osc_string(a0)
+        elif isinstance(a0, (int, np.integer)):
+            tags += 'i'
+            body += struct.pack('>i', a0)
+        else:
+            tags += 'f'
+            body += struct.pack('>f', a0)
+    return _osc_string(address) + _osc_string(tags) + body
+
+def _read_string(data, pos):
+    end = data.index(b'\0', pos)
+    return data[pos:end].decode(), end + 1 + (-(end + 1 - pos) % 4)
+
+def parse_osc(data):
+    '''Address and arguments of an OSC message.'''
+    address, pos = _read_string(data, 0)
+    if not address.startswith('/'):
+        raise ValueError('Not an OSC message!')
+    tags, pos = _read_string(data, pos) if pos < len(data) else (
+        ',', pos)
+    args = []
+    for t0 in tags[1:]:
+        if t0 == 's':
+            a0, pos = _read_string(data, pos)
+        elif t0 in 'if':
+            a0 = struct.unpack_from('>' + t0, data, pos)[0]
+            pos += 4
+        else:
+            raise ValueError('Unsupported OSC type "%s"!' % t0)
+        args.append(a0)
+    return address, args
+
+class TuningServer(asyncio.DatagramProtocol):
+    '''Datagram protocol answering tuning requests.
+
+    Parameters
+    ----------
+    method : str, optional
+        Solver passed through to ``inplacetuning``.
+    cache_size : int, optional
+        Chord shapes kept in the server's ``TuningCache``; 0
+        disables caching.
+    history : int, optional
+        Number of recent requests the latency percentiles are
+        computed over.
+
+    Attributes
+    ----------
+    coalesced : int
+        Requests answered by a solve started for another client.
+    '''
+
+    def __init__(self, method='log-lstsq', cache_size=1024,
+                 history=10000):
+        self.method = method
+        self.cache = TuningCache(cache_size) if cache_size else None
+        self.coalesced = 0
+        self.transport = None
+        self._latency = deque(maxlen=history)
+        self._pending = {}
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def connection_lost(self, exc):
+        self._executor.shutdown(wait=False)
+
+    def latency(self):
+        '''Requests served and p50/p99 latency in milliseconds.'''
+        if not self._latency:
+            return 0, 0.0, 0.0
+        p50, p99 = np.percentile(self._latency, [50, 99])
+        return len(self._latency), 1e3*p50, 1e3*p99
+
+    def datagram_received(self, data, addr):
+        received = perf_counter()
+        try:
+            address, args = parse_osc(data)
+        except (ValueError, IndexError, struct.error) as e:
+            self._reply('/error', [str(e)], addr, received)
+            return
+        if address == '/stats':
+            count, p50, p99 = self.latency()
+            self._reply('/stats', [count, p50, p99], addr, None)
+            return
+        if address not in ('/freqs', '/cents'):
+            self._reply(
+                '/error', ['Unknown address "%s"!' % address], addr,
+                received)
+            return
+
+        # Join a solve of the same notes that is still running
+        key = tuple(args)
+        waiting = self._pending.get(key)
+        if waiting is not None:
+            waiting.append((address, addr, received))
+            self.coalesced += 1
+            return
+        self._pending[key] = [(address, addr, received)]
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, self._solve, args)
+        future.add_done_callback(lambda f: self._done(key, f))
+
+    def _solve(self, notes):
+        res = inplacetuning(
+            list(notes), method=self.method, cache=self.cache)
+        return res.freq_opt, res.cents
+
+    def _done(self, key, future):
+        waiting = self._pending.pop(key)
+        try:
+            freqs, cents = future.result()
+        except Exception as e:  # pylint: disable=broad-except
+            for _address, addr, received in waiting:
+                self._reply('/error', [str(e)], addr, received)
+            return
+        for address, addr, received in waiting:
+            out = freqs if address == '/freqs' else cents
+            self._reply(address, out.tolist(), addr, received)
+
+    def _reply(self, address, args, addr, received):
+        self.transport.sendto(osc_message(address, args), addr)
+        if received is not None:
+            self._latency.append(perf_counter() - received)
+
+async def serve(host='127.0.0.1', port=57120, **kwargs):
+    '''Start a tuning server on the running event loop.
+
+    Parameters
+    ----------
+    host : str, optional
+        Address to listen on, local only by default.
+    port : int, optional
+        UDP port; 0 picks a free one.
+    **kwargs
+        Passed to ``TuningServer``.
+
+    Returns
+    -------
+    transport : asyncio.DatagramTransport
+        Close it to stop the server.
+    server : TuningServer
+        The protocol instance, for its latency and counters.
+    '''
+    loop = asyncio.get_running_loop()
+    return await loop.create_datagram_endpoint(
+        lambda: TuningServer(**kwargs), local_addr=(host, port))
+
+async def _main(args):
+    _transport, server = await serve(
+        args.host, args.port, method=args.method)
+    while True:
+        await asyncio.sleep(args.report)
+        count, p50, p99 = server.latency()
+        print(
+            '%d requests, p50 %.3f ms, p99 %.3f ms, %d coalesced' % (
+                count, p50, p99, server.coalesced), flush=True)
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Serve tunings over local UDP (OSC).')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=57120)
+    parser.add_argument('--method', default='log-lstsq')
+    parser.add_argument(
+        '--report', type=float, default=10,
+        help='seconds between latency reports')
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
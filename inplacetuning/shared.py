@@ -0,0 +1,394 @@
+'''Tuning cache shared between processes.
+
+Several processes on one machine, e.g. the synths of a live rig,
+each tuning the same repertoire would otherwise keep their own
+``TuningCache`` and solve every chord shape once per process.  Here
+the solutions live in one ``multiprocessing.shared_memory`` segment
+laid out as an open-addressing hash table of fixed capacity:
+
+- one designated writer creates the segment and publishes every
+  shape it solves (or a whole repertoire up front with
+  ``publish``)
+- any number of readers attach by name and look shapes up without
+  copying or locking; shapes the writer has not published yet are
+  solved locally, kept in a small private ``TuningCache`` and sent
+  to the writer through a few request slots
+- the writer publishes what readers sent whenever it calls
+  ``drain``
+
+Entries are never moved or evicted once published, and a slot is
+only marked full after its key and value are written, so readers
+never see a half written entry.  When the table is full further
+shapes are no longer published.  Readers do not lock the request
+slots either: a request is placed by its key, two readers racing
+for one slot are caught by a checksum, and a slot still waiting
+for the writer is not overwritten.  Requests that lose are simply
+dropped; the reader resends the shape the next time it uses it.
+'''
+
+from hashlib import blake2b
+from multiprocessing import shared_memory
+import threading
+
+import numpy as np
+
+from .cache import CacheInfo, TuningCache
+
+_MAGIC = b'IPTSHM02'
+_HEADER = np.dtype([
+    ('magic', 'S8'), ('capacity', '<i8'), ('max_notes', '<i8'),
+    ('count', '<i8'), ('requests', '<i8')])
+
+# Slot states
+_EMPTY, _FULL = 0, 1
+
+# Publish into at most this fraction of the slots so probes stay
+# short
+_MAX_LOAD = 0.75
+
+def _slot_dtype(max_notes):
+    return np.dtype([
+        ('digest', '<u8', (2,)), ('cost', '<f8'), ('size', '<i4'),
+        ('state', '<i4'), ('freqs', '<f8', (max_notes,))])
+
+def _request_dtype(max_notes):
+    return np.dtype([
+        ('digest', '<u8', (2,)), ('cost', '<f8'), ('size', '<i4'),
+        ('state', '<i4'), ('check', '<u8'),
+        ('freqs', '<f8', (max_notes,))])
+
+def _check(digest, cost, freqs):
+    '''Checksum of a request, to drop requests written over.'''
+    h0 = blake2b(digest_size=8)
+    h0.update(np.array(digest, dtype='<u8').tobytes())
+    h0.update(np.array([cost, freqs.size], dtype='<f8').tobytes())
+    h0.update(np.asarray(freqs, dtype='<f8').tobytes())
+    return int.from_bytes(h0.digest(), 'little')
+
+def _digest(key):
+    '''Hash of a cache key that is the same in every process.'''
+    h0 = blake2b(digest_size=16)
+    for part in key:
+        if isinstance(part, str):
+            part = part.encode()
+        data = bytes(part)
+        h0.update(len(data).to_bytes(8, 'little'))
+        h0.update(data)
+    digest = h0.digest()
+    return (
+        int.from_bytes(digest[:8], 'little'),
+        int.from_bytes(digest[8:], 'little'))
+
+class SharedTuningCache(object):
+    '''Tuning cache in a shared memory segment.
+
+    Parameters
+    ----------
+    name : str, optional
+        Name of the segment.  Readers attach to the segment the
+        writer created under this name; a writer picks a free name
+        when none is given.
+    create : bool, optional
+        Create the segment and become its writer.  Exactly one
+        process should do so and keep it open while others use it.
+    capacity : int, optional
+        Slots of a new segment.  Up to three quarters of them are
+        filled.
+    max_notes : int, optional
+        Largest chord of a new segment.  Larger chords are solved
+        but not published.
+    requests : int, optional
+        Request slots of a new segment, through which readers send
+        the shapes they solved themselves to the writer.
+    local_size : int, optional
+        Size of the private ``TuningCache`` a reader keeps for
+        shapes the writer has not published; 0 disables it.
+
+    Notes
+    -----
+    Pass an instance as the ``cache`` argument of
+    ``inplacetuning``.  Hits return views into the segment.  The
+    writer must outlive the readers' use of the segment; call
+    ``close`` in every process and ``unlink`` in the writer when
+    done, or use the cache as a context manager.  The writer should
+    call ``drain`` now and then, e.g. between notes, to publish the
+    shapes readers missed.
+
+    Examples
+    --------
+    In the writer:
+
+    >>> from inplacetuning import inplacetuning
+    >>> from inplacetuning.shared import SharedTuningCache
+    >>> writer = SharedTuningCache('rig', create=True)
+    >>> writer.publish([['c', 'e', 'g'], ['d', 'f', 'a']])
+    >>> len(writer)
+    2
+
+    and in each synth:
+
+    >>> cache = SharedTuningCache('rig')
+    >>> res = inplacetuning(['e', 'g', 'b'], cache=cache)
+    >>> res = inplacetuning(['c', 'e', 'g', 'b'], cache=cache)
+    >>> cache.info().hits, cache.info().misses
+    (1, 1)
+
+    after which the writer publishes Cmaj7 for everyone:
+
+    >>> writer.drain()
+    1
+    >>> len(cache)
+    3
+
+    When done, every process closes the segment and the writer
+    removes it:
+
+    >>> cache.close()
+    >>> writer.close()
+    >>> writer.unlink()
+    '''
+
+    def __init__(self, name=None, create=False, capacity=4096,
+                 max_notes=12, requests=64, local_size=256):
+        if create:
+            assert capacity > 0, 'capacity must be positive!'
+            assert max_notes > 0, 'max_notes must be positive!'
+            assert requests > 0, 'requests must be positive!'
+            slot = _slot_dtype(max_notes)
+            request = _request_dtype(max_notes)
+            self._shm = shared_memory.SharedMemory(
+                name, create=True,
+                size=_HEADER.itemsize + capacity*slot.itemsize
+                + requests*request.itemsize)
+            self._header = np.ndarray(
+                (), _HEADER, buffer=self._shm.buf)
+            self._header[()] = (
+                _MAGIC, capacity, max_notes, 0, requests)
+        else:
+            assert name is not None, 'Need the name of a segment!'
+            self._shm = _attach(name)
+            self._header = np.ndarray(
+                (), _HEADER, buffer=self._shm.buf)
+            if self._header['magic'] != _MAGIC:
+                self._header = None
+                self._shm.close()
+                raise ValueError(
+                    'Not a tuning cache segment "%s"!' % name)
+        self.name = self._shm.name
+        self.writer = create
+        self.capacity = int(self._header['capacity'])
+        self.max_notes = int(self._header['max_notes'])
+        slot = _slot_dtype(self.max_notes)
+        slots = np.ndarray(
+            (self.capacity,), slot,
+            buffer=self._shm.buf, offset=_HEADER.itemsize)
+        if not create:
+            slots.flags.writeable = False
+        self._requests = np.ndarray(
+            (int(self._header['requests']),),
+            _request_dtype(self.max_notes), buffer=self._shm.buf,
+            offset=_HEADER.itemsize + self.capacity*slot.itemsize)
+        self._digests = slots['digest']
+        self._costs = slots['cost']
+        self._sizes = slots['size']
+        self._states = slots['state']
+        self._freqs = slots['freqs']
+        self._local = None
+        if not create and local_size:
+            self._local = TuningCache(local_size)
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        if self.writer:
+            self.unlink()
+
+    def __len__(self):
+        return int(self._header['count'])
+
+    def _find(self, digest):
+        '''Slot holding digest, or the empty slot it would go in.'''
+        states, digests = self._states, self._digests
+        ii = digest[0] % self.capacity
+        for _probe in range(self.capacity):
+            if states[ii] == _EMPTY:
+                return ii, False
+            if (digests[ii, 0] == digest[0]
+                    and digests[ii, 1] == digest[1]):
+                return ii, True
+            ii = (ii + 1) % self.capacity
+        return None, False
+
+    def get(self, key):
+        '''Return the cached value for key or None.
+
+        Values a reader finds only in its private cache are sent to
+        the writer again in case the last request was dropped.
+        '''
+        digest = _digest(key)
+        ii, found = self._find(digest)
+        if found:
+            self.hits += 1
+            size = self._sizes[ii]
+            return self._freqs[ii, :size], self._costs[ii]
+        if self._local is not None:
+            value = self._local.get(key)
+            if value is not None:
+                self.hits += 1
+                self._request(digest, *value)
+                return value
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        '''Publish value under key from the writer.
+
+        Readers keep the value in their private cache instead and
+        request that the writer publish it.  Values are not
+        published once the table is full or when the chord has more
+        than max_notes notes.
+        '''
+        if not self.writer:
+            if self._local is not None:
+                self._local.put(key, value)
+            self._request(_digest(key), *value)
+            return
+        self._store(_digest(key), *value)
+
+    def _request(self, digest, freqs, cost):
+        '''Send a value to the writer unless its slot is taken.'''
+        if len(freqs) > self.max_notes:
+            return
+        requests = self._requests
+        ii = digest[0] % requests.size
+        if requests['state'][ii] != _EMPTY:
+            return
+        requests['digest'][ii] = digest
+        requests['cost'][ii] = cost
+        requests['size'][ii] = len(freqs)
+        requests['freqs'][ii, :len(freqs)] = freqs
+        requests['check'][ii] = _check(
+            digest, cost, np.asarray(freqs))
+        requests['state'][ii] = _FULL
+
+    def drain(self):
+        '''Publish the values readers requested, from the writer.
+
+        Returns
+        -------
+        int
+            Number of requests accepted.  Requests written over
+            by a racing reader are dropped.
+        '''
+        assert self.writer, 'Only the writer can drain requests!'
+        requests = self._requests
+        num = 0
+        for ii in np.flatnonzero(requests['state'] == _FULL):
+            req = requests[ii].copy()
+            requests['state'][ii] = _EMPTY
+            digest = tuple(req['digest'].tolist())
+            freqs = req['freqs'][:req['size']]
+            if req['check'] == _check(digest, req['cost'], freqs):
+                self._store(digest, freqs, req['cost'])
+                num += 1
+        return num
+
+    def _store(self, digest, freqs, cost):
+        '''Publish a value unless full, too large or present.'''
+        count = int(self._header['count'])
+        if (len(freqs) > self.max_notes
+                or count >= _MAX_LOAD*self.capacity):
+            return
+        ii, found = self._find(digest)
+        if found or ii is None:
+            return
+        self._digests[ii] = digest
+        self._costs[ii] = cost
+        self._sizes[ii] = len(freqs)
+        self._freqs[ii, :len(freqs)] = freqs
+        self._states[ii] = _FULL
+        self._header['count'] = count + 1
+
+    def publish(self, chords, method='L-BFGS-B', **kwargs):
+        '''Solve chords and publish their shapes from the writer.
+
+        Parameters
+        ----------
+        chords : iterable of list
+            Chords in any form accepted by ``inplacetuning``.
+        method : str, optional
+            Solver the readers will ask for; it is part of the key.
+        **kwargs
+            Passed to ``inplacetuning``.
+        '''
+        from .inplacetuning import inplacetuning
+        assert self.writer, 'Only the writer can publish!'
+        for chord in chords:
+            inplacetuning(chord, method=method, cache=self, **kwargs)
+
+    def info(self):
+        '''Hit and miss counters of this process and table size.'''
+        return CacheInfo(
+            self.hits, self.misses, self.capacity, len(self))
+
+    def clear(self):
+        '''Drop all entries and reset the counters.
+
+        Readers must not look anything up while the writer clears.
+        '''
+        if self.writer:
+            self._states[:] = _EMPTY
+            self._requests['state'] = _EMPTY
+            self._header['count'] = 0
+        if self._local is not None:
+            self._local.clear()
+        self.hits = self.misses = 0
+
+    def close(self):
+        '''Detach from the segment in this process.'''
+        if self._header is None:
+            return
+        self._header = self._digests = self._costs = None
+        self._sizes = self._states = self._freqs = None
+        self._requests = None
+        self._shm.close()
+
+    def unlink(self):
+        '''Remove the segment; call once, from the writer.'''
+        self._shm.unlink()
+
+# Serializes attaching while the resource tracker is patched
+_ATTACH_LOCK = threading.Lock()
+
+def _attach(name):
+    '''Open an existing segment without taking ownership of it.
+
+    Processes that merely attach must not unlink the writer's
+    segment when they exit.  Before Python 3.13 every attach is
+    registered with the resource tracker, which does so, and
+    unregistering afterwards would drop the writer's own
+    registration when both share a tracker; so registration is
+    skipped while attaching.
+
+    The skip patches ``resource_tracker.register`` for the whole
+    process.  Attaches are serialized by a lock, but another thread
+    creating a shared memory segment or semaphore at the same
+    moment would not be tracked either; attach before starting such
+    threads.
+    '''
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        pass
+    from multiprocessing import resource_tracker
+    with _ATTACH_LOCK:
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args: None
+        try:
+            return shared_memory.SharedMemory(name)
+        finally:
+            resource_tracker.register = register
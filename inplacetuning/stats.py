@@ -0,0 +1,71 @@
+'''Opt-in instrumentation of a tuning call.'''
+
+from collections import OrderedDict
+from time import perf_counter
+
+class TuningStats(object):
+    '''Per-stage wall time and solver counters of a tuning call.
+
+    Pass an instance as the ``stats`` argument of ``inplacetuning``
+    to have it filled in.  Nothing is timed when no instance is
+    given.
+
+    Attributes
+    ----------
+    stages : OrderedDict
+        Seconds spent in each stage, in the order they ran:
+        'validate', 'pairs', 'intervals', 'freqs', 'cache' and
+        'solve'.
+    nfev : int
+        Objective (or residual) evaluations by the solver.
+    njev : int
+        Gradient (or Jacobian) evaluations by the solver.
+    nit : int
+        Solver iterations.
+    success : bool
+        Whether the solver reported convergence.
+    message : str
+        Solver status message.
+    cache_hit : bool
+        Whether the solution came from a ``TuningCache``.
+    '''
+
+    def __init__(self):
+        self.stages = OrderedDict()
+        self.nfev = self.njev = self.nit = 0
+        self.success = None
+        self.message = ''
+        self.cache_hit = False
+        self._last = None
+
+    def __repr__(self):
+        times = ', '.join([
+            '%s=%.1fus' % (k0, v0*1e6)
+            for k0, v0 in self.stages.items()])
+        return '%s(%s, nfev=%d, nit=%d, success=%s)' % (
+            type(self).__name__, times, self.nfev, self.nit,
+            self.success)
+
+    @property
+    def total(self):
+        '''Seconds spent in all stages.'''
+        return sum(self.stages.values())
+
+    def start(self):
+        '''Start timing the first stage.'''
+        self._last = perf_counter()
+
+    def mark(self, stage):
+        '''Charge the time since the last mark to stage.'''
+        now = perf_counter()
+        spent = now - self._last
+        self.stages[stage] = self.stages.get(stage, 0) + spent
+        self._last = now
+
+    def record(self, res):
+        '''Copy counters from a scipy OptimizeResult.'''
+        self.nfev = res.get('nfev', 0)
+        self.njev = res.get('njev', 0)
+        self.nit = res.get('nit', 0)
+        self.success = bool(res.get('success', True))
+        self.message = str(res.get('message', ''))
@@ -0,0 +1,96 @@
+'''Block-based additive synthesis of tuned chords.
+
+Each voice is a phase-accumulator sine oscillator.  Audio is
+produced a block at a time and the phase of every voice carries
+over between blocks, so frequencies can change at block
+boundaries without clicks and pieces of any length render in
+constant memory.
+'''
+
+import numpy as np
+
+class Oscillators(object):
+    '''Bank of phase-continuous sine oscillators.
+
+    Parameters
+    ----------
+    rate : int, optional
+        Sample rate in Hz.
+    block_size : int, optional
+        Default number of samples per rendered block.
+    '''
+
+    def __init__(self, rate=44100, block_size=1024):
+        self.rate = rate
+        self.block_size = block_size
+        self._phase = np.zeros(0)
+        self._ramp = np.arange(1, block_size + 1)/rate
+
+    def reset(self):
+        '''Restart all voices at zero phase.'''
+        self._phase = np.zeros(0)
+
+    def render(self, freqs, num_samples=None):
+        '''Render the next block with the given voice frequencies.
+
+        Parameters
+        ----------
+        freqs : array_like
+            Frequency of each voice in Hz.  Voice k keeps its phase
+            from the previous block; voices beyond the previous
+            count start at zero phase.
+        num_samples : int, optional
+            Samples to render, block_size by default.
+
+        Returns
+        -------
+        array_like
+            Mean of the voices, shape (num_samples,).
+        '''
+        freqs = np.asarray(freqs, dtype=float)
+        if num_samples is None:
+            num_samples = self.block_size
+        if num_samples > self._ramp.size:
+            self._ramp = np.arange(1, num_samples + 1)/self.rate
+        ramp = self._ramp[:num_samples]
+
+        nv = freqs.size
+        if nv != self._phase.size:
+            phase = np.zeros(nv)
+            keep = min(nv, self._phase.size)
+            phase[:keep] = self._phase[:keep]
+            self._phase = phase
+        if not nv:
+            return np.zeros(num_samples)
+
+        omega = 2*np.pi*freqs
+        out = np.sin(self._phase[:, None] + omega[:, None]*ramp)
+        self._phase = np.mod(
+            self._phase + omega*num_samples/self.rate, 2*np.pi)
+        return out.mean(axis=0)
+
+def render(chords, rate=44100, block_size=1024):
+    '''Yield audio blocks for a sequence of tuned chords.
+
+    Parameters
+    ----------
+    chords : iterable of (array_like, float)
+        Voice frequencies and duration in seconds of each chord.
+    rate : int, optional
+        Sample rate in Hz.
+    block_size : int, optional
+        Maximum number of samples per yielded block.
+
+    Yields
+    ------
+    array_like
+        Consecutive blocks of at most block_size samples.  Blocks
+        never straddle two chords.
+    '''
+    osc = Oscillators(rate=rate, block_size=block_size)
+    for freqs, seconds in chords:
+        remaining = int(round(seconds*rate))
+        while remaining > 0:
+            num = min(remaining, block_size)
+            yield osc.render(freqs, num)
+            remaining -= num
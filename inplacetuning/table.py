@@ -0,0 +1,196 @@
+'''Precomputed chord tuning table.
+
+Every set of up to ``max_notes`` distinct note names accepted by
+``inplacetuning`` is solved offline and the tuned frequencies are
+stored in one ``.npy`` array, one row per chord.  Rows are placed by
+the rank of the chord in the combinatorial number system, so the
+row of a chord is computed from its note codes with a few integer
+additions and no search.
+
+At runtime the array is memory-mapped; only the pages that are
+looked up are read, and neither SciPy nor the solver is imported.
+``ChordTable.tune`` falls back to the closed-form solver for chords
+larger than the table, which still needs nothing beyond NumPy.
+'''
+
+from itertools import combinations, islice
+
+import numpy as np
+
+from utils import _NOTENAMES
+
+_NUM_NAMES = len(_NOTENAMES)
+_CODES = {n0: ii for ii, n0 in enumerate(_NOTENAMES)}
+
+def _binomials(max_notes):
+    '''binom[n, k] = n choose k for n < _NUM_NAMES, k <= max_notes.'''
+    binom = np.zeros((_NUM_NAMES, max_notes + 1), dtype=np.int64)
+    binom[:, 0] = 1
+    for nn in range(1, _NUM_NAMES):
+        binom[nn, 1:] = binom[nn - 1, 1:] + binom[nn - 1, :-1]
+    return binom
+
+def _offsets(max_notes):
+    '''First row of the chords of each size.'''
+    binom = _binomials(max_notes)
+    sizes = [0] + [
+        binom[-1, k] + binom[-1, k - 1]
+        for k in range(1, max_notes + 1)]
+    return np.cumsum(sizes)
+
+def _ranks(codes, binom, offsets):
+    '''Row of each chord of sorted note codes, shape (m, k).'''
+    kk = codes.shape[1]
+    return offsets[kk - 1] + binom[codes, np.arange(1, kk + 1)].sum(
+        axis=1)
+
+class ChordTable(object):
+    '''Memory-mapped lookup of precomputed chord tunings.
+
+    Parameters
+    ----------
+    path : str
+        Table written by ``build_table``.
+
+    Notes
+    -----
+    Chords are stored with their distinct notes in the order of
+    the accepted note names; ``lookup`` returns the frequencies in
+    the order the notes were given.
+    '''
+
+    def __init__(self, path):
+        self.freqs = np.load(path, mmap_mode='r')
+        self.max_notes = self.freqs.shape[1]
+        self._binom = _binomials(self.max_notes)
+        self._offsets = _offsets(self.max_notes)
+
+        # Plain Python copies keep single lookups free of numpy
+        # scalar overhead
+        self._binom_list = self._binom.tolist()
+        self._offsets_list = self._offsets.tolist()
+
+    def row(self, notes):
+        '''Table row and note positions within it.'''
+        codes = sorted(set([_CODES[n0] for n0 in notes]))
+        kk = len(codes)
+        if not 0 < kk <= self.max_notes:
+            raise KeyError('Chord size %d not in table!' % kk)
+        row = self._offsets_list[kk - 1]
+        binom = self._binom_list
+        for ii, c0 in enumerate(codes):
+            row += binom[c0][ii + 1]
+        return row, [codes.index(_CODES[n0]) for n0 in notes]
+
+    def lookup(self, notes):
+        '''Tuned frequencies of notes, in the order given.'''
+        row, pos = self.row(notes)
+        stored = self.freqs[row].tolist()
+        freqs = [stored[p0] for p0 in pos]
+        if any([f0 != f0 for f0 in freqs]):
+            raise KeyError('No tuning stored for %s!' % notes)
+        return freqs
+
+    def tune(self, notes):
+        '''Tuned frequencies from the table or in closed form.
+
+        Chords with more distinct notes than the table holds are
+        solved with ``inplacetuning(notes, method='log-lstsq')``.
+        Chords of the table's sizes without a stored tuning still
+        raise KeyError.
+        '''
+        if len(set(notes)) <= self.max_notes:
+            return self.lookup(notes)
+        from .inplacetuning import inplacetuning
+        return inplacetuning(
+            list(notes), method='log-lstsq')[0].tolist()
+
+    def lookup_codes(self, codes):
+        '''Tuned frequencies of many chords at once.
+
+        Parameters
+        ----------
+        codes : array_like
+            Indices into the accepted note names, shape (m, k),
+            each row strictly increasing.
+
+        Returns
+        -------
+        array_like
+            Frequencies of shape (m, k), NaN where no tuning is
+            stored.
+        '''
+        codes = np.asarray(codes, dtype=np.int64)
+        kk = codes.shape[1]
+        rows = _ranks(codes, self._binom, self._offsets)
+        return self.freqs[rows, :kk]
+
+def _solve_chunk(codes):
+    '''Tune a chunk of chords of the same size.'''
+    from .batch import inplacetuning_batch
+    chords = [[_NOTENAMES[c0] for c0 in row] for row in codes]
+    freq_opt = inplacetuning_batch(chords, errors='nan')[0]
+    return codes, freq_opt.astype(np.float32)
+
+def _chunks(max_notes, chunksize):
+    '''Sorted note codes of every chord, in chunks.'''
+    for kk in range(1, max_notes + 1):
+        combos = combinations(range(_NUM_NAMES), kk)
+        while True:
+            chunk = list(islice(combos, chunksize))
+            if not chunk:
+                break
+            yield np.array(chunk, dtype=np.int64)
+
+def build_table(path, max_notes=6, max_workers=None, chunksize=20000):
+    '''Solve every chord up to max_notes notes and save the table.
+
+    Parameters
+    ----------
+    path : str
+        Output ``.npy`` file.
+    max_notes : int, optional
+        Largest chord size to store.  Six notes give about two
+        million chords and a 48 MB table.
+    max_workers : int, optional
+        Worker processes, all available cores by default.
+    chunksize : int, optional
+        Chords solved per task with ``inplacetuning_batch``.
+
+    Returns
+    -------
+    ChordTable
+        The table, opened from path.
+
+    Notes
+    -----
+    Chords are solved with the closed-form 'log-lstsq' method.
+    Rows of chords without a defined tuning are NaN.
+    '''
+    from concurrent.futures import ProcessPoolExecutor
+    from .parallel import _num_workers
+
+    offsets = _offsets(max_notes)
+    binom = _binomials(max_notes)
+    out = np.lib.format.open_memmap(
+        path, mode='w+', dtype=np.float32,
+        shape=(int(offsets[-1]), max_notes))
+    out[:] = np.nan
+    with ProcessPoolExecutor(_num_workers(max_workers)) as pool:
+        for codes, freqs in pool.map(
+                _solve_chunk, _chunks(max_notes, chunksize)):
+            kk = codes.shape[1]
+            out[_ranks(codes, binom, offsets), :kk] = freqs[:, :kk]
+    out.flush()
+    del out
+    return ChordTable(path)
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Precompute the chord tuning table.')
+    parser.add_argument('path', help='output .npy file')
+    parser.add_argument('--max-notes', type=int, default=6)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+    build_table(args.path, args.max_notes, args.workers)
@@ -0,0 +1,96 @@
+'''Real-time tuning of a stream of note events.'''
+
+from collections import OrderedDict
+
+import numpy as np
+
+from utils import _NOTENAMES
+from .inplacetuning import _problem, _solve
+from .notes import as_codes, frequencies
+
+class Tuner(object):
+    '''Keep the set of sounding notes tuned as notes come and go.
+
+    Parameters
+    ----------
+    method : str, optional
+        Solver passed through to the tuning optimization.  The
+        default closed-form 'log-lstsq' solver keeps per-event
+        latency in the microsecond range.
+    tol : float, optional
+        Frequencies that move by less than this many cents are not
+        reported as changed.
+    reference : float, optional
+        Frequency of A4 in Hz new notes are placed from.
+    temperament : array_like, optional
+        Cents from equal temperment of each pitch class new notes
+        start from, see ``inplacetuning``.
+
+    Notes
+    -----
+    After every event the sounding notes are re-optimized starting
+    from their current frequencies (new notes start from equal
+    temperment), so held notes only move as much as the new
+    intervals require.  Only the notes whose frequency changed are
+    returned, ready to be sent to a synthesizer.
+
+    Examples
+    --------
+    >>> tuner = Tuner()
+    >>> {n0: round(f0, 2) for n0, f0 in tuner.note_on('c').items()}
+    {'c': 523.25}
+    >>> changed = tuner.note_on('e')
+    '''
+
+    def __init__(self, method='log-lstsq', tol=0.01, reference=440.0,
+                 temperament=None):
+        self.method = method
+        self.tol = tol
+        self.reference = reference
+        self.temperament = temperament
+        self._freqs = OrderedDict()
+
+    @property
+    def sounding(self):
+        '''Currently sounding notes with their frequencies.'''
+        return OrderedDict(self._freqs)
+
+    def note_on(self, note):
+        '''Start sounding note and return changed frequencies.'''
+        assert note in _NOTENAMES, 'Invalid note name provided!'
+        if note in self._freqs:
+            return {}
+        self._freqs[note] = float(
+            frequencies([note], self.reference, self.temperament)[0])
+        return self._retune(new=note)
+
+    def note_off(self, note):
+        '''Stop sounding note and return changed frequencies.
+
+        Releasing a note that is not sounding is ignored.
+        '''
+        if self._freqs.pop(note, None) is None:
+            return {}
+        return self._retune()
+
+    def reset(self):
+        '''Silence all notes.'''
+        self._freqs.clear()
+
+    def _retune(self, new=None):
+        '''Re-optimize the sounding notes from their last tuning.'''
+        notes = list(self._freqs)
+        if len(notes) < 2:
+            return {new: self._freqs[new]} if new is not None else {}
+        idx0, idx1, ratio_desired, _freq_init = _problem(
+            as_codes(notes))
+        start = np.fromiter(self._freqs.values(), dtype=float)
+        freq_opt, _cost = _solve(
+            start, idx0, idx1, ratio_desired, self.method)
+
+        changed = {}
+        cents = 1200*np.abs(np.log2(freq_opt/start))
+        for n0, f0, c0 in zip(notes, freq_opt, cents):
+            if n0 == new or c0 >= self.tol:
+                self._freqs[n0] = changed[n0] = float(f0)
+        return changed
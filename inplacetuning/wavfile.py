@@ -0,0 +1,135 @@
+'''Write WAV files a block at a time.
+
+Samples go through a reusable conversion buffer into a buffered
+file, and the RIFF sizes are filled in when the file is closed, so
+long renders are bounded by disk space rather than memory, up to
+the 4 GiB a RIFF file can address.
+'''
+
+import struct
+
+import numpy as np
+
+# WAVE format tags
+_PCM = 1
+_IEEE_FLOAT = 3
+
+# Largest RIFF file, header included
+_MAX_BYTES = 0xFFFFFFFF
+
+class WavWriter(object):
+    '''Streaming WAV file writer.
+
+    Parameters
+    ----------
+    path : str
+        File to write.
+    rate : int
+        Sample rate in Hz.
+    channels : int, optional
+        Number of interleaved channels.
+    dtype : {'int16', 'float32'}, optional
+        Sample format in the file.  Float input in [-1, 1] is
+        scaled and clipped for 'int16'.
+    buffering : int, optional
+        Size of the file buffer in bytes.
+
+    Examples
+    --------
+    >>> from inplacetuning.synth import render
+    >>> with WavWriter('out.wav', 44100) as wav:
+    ...     for block in render([([440, 550], 2)]):
+    ...         wav.write(block)
+    '''
+
+    def __init__(
+            self, path, rate, channels=1, dtype='int16',
+            buffering=1 << 20):
+        if dtype not in ('int16', 'float32'):
+            raise ValueError('Unsupported dtype "%s"!' % dtype)
+        self.rate = rate
+        self.channels = channels
+        self.dtype = np.dtype(dtype).newbyteorder('<')
+        self.frames = 0
+        self._buf = np.zeros(0, dtype=self.dtype)
+        self._scratch = np.zeros(0)
+        self._f = open(path, 'wb', buffering=buffering)
+        self._write_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def _is_float(self):
+        return self.dtype.kind == 'f'
+
+    def _write_header(self):
+        '''Header with sizes left at zero until close().'''
+        width = self.dtype.itemsize
+        fmt = struct.pack(
+            '<HHIIHH',
+            _IEEE_FLOAT if self._is_float else _PCM,
+            self.channels, self.rate,
+            self.rate*self.channels*width, self.channels*width,
+            8*width)
+        if self._is_float:
+            fmt += b'\0\0'
+        header = b'RIFF\0\0\0\0WAVE'
+        header += b'fmt ' + struct.pack('<I', len(fmt)) + fmt
+        if self._is_float:
+            self._fact_pos = len(header) + 8
+            header += b'fact' + struct.pack('<II', 4, 0)
+        header += b'data\0\0\0\0'
+        self._data_pos = len(header)
+        self._f.write(header)
+
+    def write(self, block):
+        '''Append samples, shape (n,) or (n, channels).
+
+        Raises ValueError without writing anything if the block
+        would take the file past 4 GiB; the file written so far is
+        still valid once closed.
+        '''
+        block = np.asarray(block)
+        size = block.size
+        if size % self.channels:
+            raise ValueError('Block does not fill every channel!')
+        data_bytes = (
+            self.frames*self.channels + size)*self.dtype.itemsize
+        if self._data_pos + data_bytes + data_bytes % 2 > _MAX_BYTES:
+            raise ValueError('WAV files are limited to 4 GiB!')
+        if self._buf.size < size:
+            self._buf = np.empty(size, dtype=self.dtype)
+            self._scratch = np.empty(size)
+        out = self._buf[:size]
+        flat = block.reshape(-1)
+        if self._is_float or block.dtype.kind in 'iu':
+            np.copyto(out, flat, casting='unsafe')
+        else:
+            tmp = self._scratch[:size]
+            np.multiply(flat, 32767, out=tmp)
+            np.clip(tmp, -32768, 32767, out=tmp)
+            np.rint(tmp, out=tmp)
+            np.copyto(out, tmp, casting='unsafe')
+        self._f.write(memoryview(out).cast('B'))
+        self.frames += size//self.channels
+
+    def close(self):
+        '''Fill in the RIFF sizes and close the file.'''
+        if self._f.closed:
+            return
+        data_bytes = self.frames*self.channels*self.dtype.itemsize
+        if data_bytes % 2:
+            self._f.write(b'\0')
+        self._f.seek(4)
+        self._f.write(struct.pack(
+            '<I', self._data_pos - 8 + data_bytes + data_bytes % 2))
+        if self._is_float:
+            self._f.seek(self._fact_pos)
+            self._f.write(struct.pack('<I', self.frames))
+        self._f.seek(self._data_pos - 4)
+        self._f.write(struct.pack('<I', data_bytes))
+        self._f.close()
@@ -0,0 +1,60 @@
+'''Test tuning many chords at once.'''
+
+import unittest
+
+import numpy as np
+
+from inplacetuning import inplacetuning, inplacetuning_batch
+
+class TestBatch(unittest.TestCase):
+    '''Test tuning many chords at once.'''
+
+    def setUp(self):
+        '''Ragged set of chords.'''
+        self.chords = [
+            ['c', 'e', 'g'],
+            ['d', 'f', 'a', 'c'],
+            ['c', 'e'],
+            ['a', 'c', 'e', 'g', 'b', 'd'],
+        ]
+
+    def test_matches_single(self):
+        '''Each row matches a single log-lstsq solve.'''
+        fopt, feq, ropt, rdes, _rinit, cost = inplacetuning_batch(
+            self.chords)
+        self.assertEqual(fopt.shape, (4, 6))
+        for kk, chord in enumerate(self.chords):
+            res = inplacetuning(chord, method='log-lstsq')
+            nn, pp = len(chord), len(res[2])
+            self.assertTrue(np.allclose(fopt[kk, :nn], res[0]))
+            self.assertTrue(np.allclose(feq[kk, :nn], res[1]))
+            self.assertTrue(np.allclose(ropt[kk, :pp], res[2]))
+            self.assertTrue(np.allclose(rdes[kk, :pp], res[3]))
+            self.assertAlmostEqual(cost[kk], res[5])
+
+    def test_padding(self):
+        '''Unused entries are NaN.'''
+        fopt, _feq, ropt, _rdes, _rinit, _cost = inplacetuning_batch(
+            self.chords)
+        self.assertTrue(np.all(np.isnan(fopt[2, 2:])))
+        self.assertTrue(np.all(np.isnan(ropt[0, 3:])))
+        self.assertFalse(np.any(np.isnan(fopt[3])))
+
+    def test_errors_nan(self):
+        '''Untunable chords become NaN rows.'''
+        chords = self.chords + [['a##', 'ab']]
+        with self.assertRaises(ValueError):
+            inplacetuning_batch(chords)
+        fopt, _feq, _ropt, _rdes, _rinit, cost = inplacetuning_batch(
+            chords, errors='nan')
+        self.assertTrue(np.all(np.isnan(fopt[-1])))
+        self.assertTrue(np.isnan(cost[-1]))
+        self.assertFalse(np.any(np.isnan(fopt[0, :3])))
+
+    def test_bad_method(self):
+        '''Unknown method.'''
+        with self.assertRaises(ValueError):
+            inplacetuning_batch(self.chords, method='L-BFGS-B')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+'''Test memoization of transposed chords.'''
+
+import unittest
+
+import numpy as np
+
+from inplacetuning import inplacetuning, TuningCache
+
+class TestCache(unittest.TestCase):
+    '''Test memoization of transposed chords.'''
+
+    def test_transposed_hit(self):
+        '''[C, E, G] then [C#, E#, G#]'''
+        cache = TuningCache()
+        inplacetuning(['c', 'e', 'g'], cache=cache)
+        fopt, feq, _ropt, _rdes, _rinit, _cost = inplacetuning(
+            ['c#', 'e#', 'g#'], cache=cache)
+        self.assertEqual(cache.info().hits, 1)
+        self.assertEqual(cache.info().misses, 1)
+        cents = 1200*np.log2(fopt/feq)
+        self.assertTrue(np.all(np.abs(cents) < 20))
+
+    def test_matches_solve(self):
+        '''A hit agrees with solving from scratch.'''
+        cache = TuningCache()
+        inplacetuning(
+            ['c', 'e', 'g'], method='log-lstsq', cache=cache)
+        hit = inplacetuning(
+            ['c#', 'e#', 'g#'], method='log-lstsq', cache=cache)
+        ref = inplacetuning(['c#', 'e#', 'g#'], method='log-lstsq')
+        self.assertTrue(np.allclose(hit[0], ref[0], rtol=1e-5))
+        self.assertTrue(np.allclose(hit[2], ref[2], rtol=1e-5))
+
+    def test_permuted_hit(self):
+        '''Reordered notes share the entry of their chord.'''
+        cache = TuningCache()
+        inplacetuning(
+            ['c', 'e', 'g'], method='log-lstsq', cache=cache)
+        for chord in (['e', 'g', 'c'], ['g', 'c', 'e'],
+                      ['g#', 'c#', 'e#']):
+            hit = inplacetuning(
+                chord, method='log-lstsq', cache=cache)
+            ref = inplacetuning(chord, method='log-lstsq')
+            self.assertTrue(np.allclose(hit[0], ref[0], rtol=1e-5))
+        self.assertEqual(cache.info().hits, 3)
+        self.assertEqual(cache.info().misses, 1)
+
+    def test_method_in_key(self):
+        '''Different methods do not share entries.'''
+        cache = TuningCache()
+        inplacetuning(['c', 'e', 'g'], cache=cache)
+        inplacetuning(
+            ['c', 'e', 'g'], method='log-lstsq', cache=cache)
+        self.assertEqual(cache.info().hits, 0)
+
+    def test_eviction(self):
+        '''Least recently used entry is dropped.'''
+        cache = TuningCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(len(cache), 2)
+
+if __name__ == '__main__':
+    unittest.main()
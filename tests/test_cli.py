@@ -0,0 +1,95 @@
+'''Test the command line tuner.'''
+
+import contextlib
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from inplacetuning import inplacetuning
+from inplacetuning.cli import main, tune_stream
+
+class TestCli(unittest.TestCase):
+    '''Test the command line tuner.'''
+
+    def test_jsonl(self):
+        '''Results in input order, errors reported in place.'''
+        lines = [
+            '["c", "e", "g"]\n', '\n', '{"notes": [72, 76, 79]}\n',
+            '["c", "h"]\n', 'not json\n']
+        out = io.StringIO()
+        tune_stream(lines, out, max_workers=1, chunksize=2)
+        res = [json.loads(l0) for l0 in out.getvalue().splitlines()]
+        self.assertEqual(len(res), 4)
+        ref = inplacetuning(['c', 'e', 'g'], method='log-lstsq')
+        self.assertTrue(np.allclose(res[0]['freqs'], ref[0]))
+        self.assertTrue(np.allclose(res[1]['freqs'], ref[0]))
+        self.assertEqual(res[1]['notes'], [72, 76, 79])
+        self.assertIn('error', res[2])
+        self.assertIn('error', res[3])
+
+    def test_empty(self):
+        '''An empty chord is an error, not the end of the stream.'''
+        lines = ['["c", "e", "g"]\n', '[]\n', '["d", "f", "a"]\n']
+        out = io.StringIO()
+        tune_stream(lines, out, max_workers=1)
+        res = [json.loads(l0) for l0 in out.getvalue().splitlines()]
+        self.assertEqual(len(res), 3)
+        self.assertEqual(res[1]['notes'], [])
+        self.assertEqual(
+            res[1]['error'], 'Must have at least one note!')
+        self.assertIn('freqs', res[2])
+
+    def test_csv_files(self):
+        '''CSV in and out through main().'''
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'chords.csv')
+            with open(path, 'w') as f:
+                f.write('c,e,g\nd, f, a\n')
+            out = io.StringIO()
+            main(['-f', 'csv', '-t', 'csv', '-j', '1', path], out)
+        rows = out.getvalue().splitlines()
+        self.assertEqual(len(rows), 2)
+        self.assertTrue(rows[0].startswith('c e g,'))
+        self.assertEqual(len(rows[1].split(',')), 5)
+
+    def test_unparsed_csv(self):
+        '''Lines that cannot be parsed are echoed unchanged.'''
+        out = io.StringIO()
+        tune_stream(
+            ['notjson\n'], out, max_workers=1, outformat='csv')
+        row = next(csv.reader([out.getvalue()]))
+        self.assertEqual(row[:2], ['notjson', ''])
+        self.assertTrue(row[2].startswith('Expecting value'))
+
+    def test_unknown_method(self):
+        '''Unknown solvers are rejected once, up front.'''
+        with self.assertRaises(ValueError):
+            tune_stream(['["c", "e", "g"]\n'], io.StringIO(),
+                        method='foo', max_workers=1)
+        with self.assertRaises(SystemExit), \
+                contextlib.redirect_stderr(io.StringIO()):
+            main(['-m', 'foo'], io.StringIO())
+
+    def test_workers(self):
+        '''python -m inplacetuning with worker processes.'''
+        chords = [['c', 'e', 'g'], ['d', 'f', 'a'], ['e', 'g', 'b']]
+        stdin = ''.join([json.dumps(c0) + '\n' for c0 in chords*20])
+        root = os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__)))
+        out = subprocess.run(
+            [sys.executable, '-m', 'inplacetuning', '-j', '2',
+             '--chunksize', '7'],
+            input=stdin.encode(), cwd=root, check=True,
+            stdout=subprocess.PIPE).stdout.decode()
+        res = [json.loads(l0) for l0 in out.splitlines()]
+        self.assertEqual([r0['notes'] for r0 in res], chords*20)
+
+if __name__ == '__main__':
+    unittest.main()
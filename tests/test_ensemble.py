@@ -0,0 +1,68 @@
+'''Test tuning of large ensembles.'''
+
+import unittest
+
+import numpy as np
+
+from inplacetuning import tune_ensemble
+from inplacetuning.ensemble import ensemble_pairs
+from inplacetuning.notes import encode
+
+class TestEnsemble(unittest.TestCase):
+    '''Test tuning of large ensembles.'''
+
+    def setUp(self):
+        '''C major spread over the keyboard, 100 voices.'''
+        voicing = np.array([36, 43, 48, 52, 55, 60, 64, 67, 72, 76])
+        self.keys = np.resize(voicing, 100)
+
+    def test_nearest(self):
+        '''Consistent chord is fit exactly.'''
+        fopt, feq, ropt, rdes, _rinit, cost = tune_ensemble(
+            self.keys)
+        self.assertEqual(fopt.shape, (100,))
+        self.assertTrue(np.allclose(ropt, rdes))
+        self.assertLess(cost, 1e-9)
+        cents = 1200*np.log2(fopt/feq)
+        self.assertTrue(np.all(np.abs(cents) < 20))
+
+    def test_octaves(self):
+        '''Desired ratios span the octaves between notes.'''
+        idx0, idx1, rdes, _w, _feq = ensemble_pairs(
+            [48, 64], neighbours=1)
+        self.assertEqual((idx0[0], idx1[0]), (0, 1))
+        self.assertAlmostEqual(rdes[0], 5/2)
+
+    def test_structured(self):
+        '''Structured notes keep their octave.'''
+        notes = encode(['c', 'g', 'e'], octave=[3, 3, 4])
+        fopt, _feq, ropt, rdes, _rinit, _cost = tune_ensemble(notes)
+        self.assertTrue(np.allclose(ropt, rdes))
+        self.assertAlmostEqual(fopt[1]/fopt[0], 3/2)
+        self.assertAlmostEqual(fopt[2]/fopt[0], 5/2)
+
+    def test_consonant(self):
+        '''Only consonant pairs are kept and weighted.'''
+        idx0, _idx1, _rdes, weights, _feq = ensemble_pairs(
+            self.keys, pairs='consonant')
+        self.assertGreater(idx0.size, 0)
+        self.assertTrue(np.all(weights >= 1/(1 + 5.5)))
+        _fopt, _feq, ropt, rdes, _rinit, cost = tune_ensemble(
+            self.keys, pairs='consonant')
+        self.assertTrue(np.allclose(ropt, rdes))
+        self.assertLess(cost, 1e-6)
+
+    def test_components(self):
+        '''Unlinked notes are left alone.'''
+        fopt, feq, ropt, _rdes, _rinit, _cost = tune_ensemble(
+            ['c', 'c#'], pairs='consonant')
+        self.assertEqual(ropt.size, 0)
+        self.assertTrue(np.allclose(fopt, feq))
+
+    def test_bad_pairs(self):
+        '''Unknown pair selection.'''
+        with self.assertRaises(ValueError):
+            tune_ensemble(self.keys, pairs='all')
+
+if __name__ == '__main__':
+    unittest.main()
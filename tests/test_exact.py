@@ -0,0 +1,82 @@
+'''Test the exact tuning of chords without a comma.'''
+
+import unittest
+
+import numpy as np
+
+from inplacetuning import inplacetuning, TuningStats
+from inplacetuning.inplacetuning import _monzo, _solve, _solve_exact
+
+class TestExact(unittest.TestCase):
+    '''Test the exact tuning of chords without a comma.'''
+
+    def setUp(self):
+        # C, D, F, A started in equal temperment
+        self.freqs = 440*2**(np.array([-9, -7, -4, 0])/12)
+
+    def test_monzo(self):
+        '''Ratios factored over 2, 3, 5 and 7.'''
+        self.assertEqual(_monzo(1.0), (0, 0, 0, 0))
+        self.assertEqual(_monzo(16/9), (4, -2, 0, 0))
+        self.assertEqual(_monzo(7/4), (-2, 0, 0, 1))
+        self.assertEqual(_monzo(3**19/2**29), (-29, 19, 0, 0))
+        self.assertIsNone(_monzo(2**(1/3)))
+        self.assertIsNone(_monzo(11/8))
+
+    def test_consistent(self):
+        '''C-F-A loop closes: 4/3 * 5/4 = 5/3.'''
+        idx0, idx1 = np.array([0, 2, 0]), np.array([2, 3, 3])
+        ratios = np.array([4/3, 5/4, 5/3])
+        fopt = _solve_exact(self.freqs, idx0, idx1, ratios)
+        self.assertTrue(np.allclose(fopt[idx1]/fopt[idx0], ratios))
+        fopt = fopt[[0, 2, 3]]
+        self.assertAlmostEqual(
+            np.mean(np.log(fopt/self.freqs[[0, 2, 3]])), 0)
+
+    def test_comma(self):
+        '''C-D-A loop misses C-A by a syntonic comma.'''
+        idx0, idx1 = np.array([0, 1, 0]), np.array([1, 3, 3])
+        ratios = np.array([9/8, 3/2, 5/3])
+        self.assertIsNone(
+            _solve_exact(self.freqs, idx0, idx1, ratios))
+        stats = TuningStats()
+        _fopt, cost = _solve(
+            self.freqs, idx0, idx1, ratios, 'L-BFGS-B', stats)
+        self.assertGreater(stats.nfev, 0)
+        self.assertGreater(cost, 0)
+
+    def test_chords(self):
+        '''Only chords with a comma reach the optimizer.'''
+        for chord, exact in (
+                (['c', 'e', 'g'], True),
+                (['d', 'f', 'a', 'c'], False),
+                (['c', 'eb', 'g', 'bb'], False)):
+            for method in ('L-BFGS-B', 'least_squares'):
+                stats = TuningStats()
+                inplacetuning(chord, method=method, stats=stats)
+                self.assertEqual(stats.nfev == 0, exact)
+                self.assertEqual(
+                    stats.message == 'Exact solution.', exact)
+
+    def test_groups(self):
+        '''Unlinked notes each keep their own pitch.'''
+        idx0, idx1 = np.array([0, 2]), np.array([1, 3])
+        ratios = np.array([9/8, 5/4])
+        fopt = _solve_exact(self.freqs, idx0, idx1, ratios)
+        self.assertTrue(np.allclose(fopt[idx1]/fopt[idx0], ratios))
+        shift = np.log(fopt/self.freqs)
+        self.assertAlmostEqual(shift[:2].sum(), 0)
+        self.assertAlmostEqual(shift[2:].sum(), 0)
+
+    def test_matches_log_lstsq(self):
+        '''Optimizer methods agree with the closed form.'''
+        chords = (['c', 'e', 'g'], ['c', 'e', 'g', 'b'], [60, 67])
+        for chord in chords:
+            res0 = inplacetuning(chord, method='log-lstsq')
+            for method in ('L-BFGS-B', 'least_squares'):
+                res1 = inplacetuning(chord, method=method)
+                self.assertTrue(np.allclose(res0[0], res1[0]))
+                self.assertLess(res1.cost, 1e-12)
+
+if __name__ == '__main__':
+    unittest.main()
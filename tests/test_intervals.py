@@ -0,0 +1,36 @@
+'''Test the compiled interval table.'''
+
+import unittest
+
+from utils import _name_to_inverval
+
+class TestIntervals(unittest.TestCase):
+    '''Test the compiled interval table.'''
+
+    def test_both_orders(self):
+        '''[E, G] and [G, E]'''
+        self.assertEqual(_name_to_inverval(('e', 'g')), 'm3')
+        self.assertEqual(_name_to_inverval(('g', 'e')), 'M6')
+
+    def test_wrap_octave(self):
+        '''[G#, C] and [Gb, A]'''
+        self.assertEqual(_name_to_inverval(('g#', 'c')), 'd4')
+        self.assertEqual(_name_to_inverval(('gb', 'a')), 'A2')
+
+    def test_triple_sharps(self):
+        '''[C, C###] and [B#, D###]'''
+        self.assertEqual(_name_to_inverval(('c', 'c###')), 'AAA1')
+        self.assertEqual(_name_to_inverval(('b#', 'd###')), 'A3')
+
+    def test_diminished_octave(self):
+        '''[C, Cb] and [B#, Bb]'''
+        self.assertEqual(_name_to_inverval(('c', 'cb')), 'd8')
+        self.assertEqual(_name_to_inverval(('b#', 'bb')), 'dd8')
+
+    def test_invalid(self):
+        '''Unknown spelling.'''
+        with self.assertRaises(KeyError):
+            _name_to_inverval(('c', 'h'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+'''Test the analytic ratio Jacobian and solver methods.'''
+
+import unittest
+
+import numpy as np
+
+from inplacetuning import inplacetuning
+from inplacetuning.inplacetuning import (
+    combinations, _get_ratios, _pair_indices, _ratios,
+    _ratio_jacobian)
+
+class TestJacobian(unittest.TestCase):
+    '''Test the analytic ratio Jacobian and solver methods.'''
+
+    def test_finite_difference(self):
+        '''Jacobian matches central differences.'''
+        idx0, idx1 = _pair_indices(4)
+        freqs = np.array([523.25, 659.25, 783.99, 493.88])
+        jac = _ratio_jacobian(freqs, idx0, idx1)
+        eps = 1e-4
+        for ii in range(freqs.size):
+            step = np.zeros(freqs.size)
+            step[ii] = eps
+            fd = (_ratios(freqs + step, idx0, idx1) -
+                  _ratios(freqs - step, idx0, idx1))/(2*eps)
+            self.assertTrue(np.allclose(jac[:, ii], fd, atol=1e-6))
+
+    def test_get_ratios(self):
+        '''Broadcast ratios match the pairs from combinations().'''
+        freqs = [523.25, 659.25, 783.99, 493.88]
+        ratios = [max(p0)/min(p0) for p0 in combinations(freqs)]
+        self.assertTrue(np.allclose(_get_ratios(freqs), ratios))
+
+    def test_duplicates(self):
+        '''Repeated notes keep their own pairs and frequency.'''
+        self.assertEqual(
+            combinations(['c', 'c', 'e']),
+            [('c', 'c'), ('c', 'e'), ('c', 'e')])
+        fopt, _feq, ropt, rdes, _rinit, _cost = inplacetuning(
+            ['c', 'c', 'e'], method='log-lstsq')
+        self.assertEqual(len(ropt), 3)
+        self.assertAlmostEqual(fopt[0], fopt[1])
+        self.assertTrue(np.allclose(ropt, rdes))
+
+    def test_least_squares(self):
+        '''C major 7 with least_squares.'''
+        _fopt, _feq, ropt, rdes, _rinit, cost = inplacetuning(
+            ['c', 'e', 'g', 'b'], method='least_squares')
+        self.assertTrue(np.allclose(ropt, rdes, atol=1e-6))
+        self.assertLess(cost, 1e-6)
+
+    def test_bad_method(self):
+        '''Unknown method.'''
+        with self.assertRaises(ValueError):
+            inplacetuning(['c', 'e'], method='newton')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+'''Test the closed-form log-domain solver.'''
+
+import unittest
+
+import numpy as np
+
+from inplacetuning import inplacetuning
+from inplacetuning.inplacetuning import _log_pinv
+
+class TestLogLstsq(unittest.TestCase):
+    '''Test the closed-form log-domain solver.'''
+
+    def test_triads(self):
+        '''Major and minor triads are solved exactly.'''
+        for triad in (['c', 'e', 'g'], ['d', 'f', 'a']):
+            _fopt, _feq, ropt, rdes, _rinit, cost = inplacetuning(
+                triad, method='log-lstsq')
+            self.assertTrue(np.allclose(ropt, rdes))
+            self.assertLess(cost, 1e-9)
+
+    def test_close_to_start(self):
+        '''Stays near the equal tempered frequencies.'''
+        fopt, feq, _ropt, _rdes, _rinit, _cost = inplacetuning(
+            ['c', 'e', 'g'], method='log-lstsq')
+        cents = 1200*np.log2(np.asarray(fopt)/feq)
+        self.assertTrue(np.all(np.abs(cents) < 20))
+
+    def test_cached(self):
+        '''Pseudo-inverse is reused for the same chord shape.'''
+        _log_pinv.cache_clear()
+        inplacetuning(['c', 'e', 'g'], method='log-lstsq')
+        inplacetuning(['c', 'e', 'g'], method='log-lstsq')
+        self.assertEqual(_log_pinv.cache_info().hits, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+'''Test retuning Standard MIDI Files.'''
+
+import io
+import os
+import struct
+import tempfile
+import unittest
+
+from inplacetuning.midi import (
+    iter_sounding_sets, retune_midi, _read_header, _read_vlq,
+    _chunks)
+
+def _write_smf(path, events, division=480):
+    '''Format 0 file from (delta, byte, ...) events.
+
+    Bytes are written as given, so channel events without a status
+    byte use running status.
+    '''
+    track = b''
+    for event in events:
+        track += bytes(event)
+    track += b'\x00\xFF\x2F\x00'
+    with open(path, 'wb') as f:
+        f.write(b'MThd' + struct.pack('>IHHH', 6, 0, 1, division))
+        f.write(b'MTrk' + struct.pack('>I', len(track)) + track)
+
+def _tunings(path):
+    '''Last cents offset of each key in the tuning track.'''
+    with open(path, 'rb') as f:
+        _read_header(f)
+        offset, length = list(_chunks(f))[-1][1:]
+        f.seek(offset)
+        track = io.BytesIO(f.read(length))
+    cents = {}
+    while True:
+        _read_vlq(track)
+        if track.read(1) != b'\xF0':
+            return cents
+        msg = track.read(_read_vlq(track))
+        for ii in range(6, 6 + 4*msg[5], 4):
+            key, semi, msb, lsb = msg[ii:ii + 4]
+            cents[key] = 100*(semi - key + ((msb << 7) | lsb)/16384)
+
+class TestMidi(unittest.TestCase):
+    '''Test retuning Standard MIDI Files.'''
+
+    def setUp(self):
+        '''C major then F major, mostly with running status.
+
+        A text meta event between the chords cancels running status.
+        '''
+        self.tmp = tempfile.mkdtemp()
+        self.src = os.path.join(self.tmp, 'in.mid')
+        self.dst = os.path.join(self.tmp, 'out.mid')
+        _write_smf(self.src, [
+            (0, 0x90, 60, 90), (0, 64, 90), (0, 67, 90),
+            (96, 0x80, 60, 0), (0, 64, 0), (0, 67, 0),
+            (0, 0xFF, 0x01, 2) + tuple(b'hi'),
+            (0, 0x90, 65, 90), (0, 69, 90), (0, 72, 90),
+            (96, 0x90, 65, 0), (0, 69, 0), (0, 72, 0),
+        ])
+
+    def tearDown(self):
+        for name in os.listdir(self.tmp):
+            os.remove(os.path.join(self.tmp, name))
+        os.rmdir(self.tmp)
+
+    def test_sounding_sets(self):
+        '''Chords are grouped by tick.'''
+        self.assertEqual(list(iter_sounding_sets(self.src)), [
+            (0, (60, 64, 67)), (96, (65, 69, 72)), (192, ())])
+
+    def test_meta_cancels_running_status(self):
+        '''Data bytes right after a meta event are an error.'''
+        _write_smf(self.src, [
+            (0, 0x90, 60, 90), (0, 0xFF, 0x01, 2) + tuple(b'hi'),
+            (0, 64, 90)])
+        with self.assertRaises(ValueError):
+            list(iter_sounding_sets(self.src))
+
+    def test_retune(self):
+        '''Output gains a tuning track and keeps the notes.'''
+        count = retune_midi(self.src, self.dst)
+        self.assertGreater(count, 0)
+        with open(self.dst, 'rb') as f:
+            fmt, ntrks, division = _read_header(f)
+            kinds = [kind for kind, _off, _ln in _chunks(f)]
+        self.assertEqual((fmt, ntrks, division), (1, 2, 480))
+        self.assertEqual(kinds, [b'MTrk', b'MTrk'])
+        self.assertEqual(
+            list(iter_sounding_sets(self.dst)),
+            list(iter_sounding_sets(self.src)))
+
+    def test_sharp_keys(self):
+        '''Thirds of E and B major are tuned flat.'''
+        _write_smf(self.src, [
+            (0, 0x90, 64, 90), (0, 68, 90), (0, 71, 90),
+            (96, 64, 0), (0, 68, 0), (0, 71, 0),
+            (0, 71, 90), (0, 75, 90), (0, 78, 90),
+            (96, 71, 0), (0, 75, 0), (0, 78, 0),
+        ])
+        retune_midi(self.src, self.dst)
+        cents = _tunings(self.dst)
+        self.assertLess(cents[68], 0)
+        self.assertLess(cents[75], 0)
+        self.assertAlmostEqual(
+            cents[68] - cents[64], -13.69, delta=0.05)
+        self.assertAlmostEqual(
+            cents[75] - cents[71], -13.69, delta=0.05)
+
+if __name__ == '__main__':
+    unittest.main()
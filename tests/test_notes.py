@@ -0,0 +1,136 @@
+'''Test compact note representations.'''
+
+import unittest
+
+import numpy as np
+
+from inplacetuning import (
+    inplacetuning, inplacetuning_batch, tune_progression, Tuner)
+from inplacetuning.notes import (
+    NOTE_DTYPE, as_codes, encode, frequencies, from_midi, to_midi,
+    to_names)
+
+class TestNotes(unittest.TestCase):
+    '''Test compact note representations.'''
+
+    def test_round_trip(self):
+        '''Names and MIDI keys survive encoding.'''
+        notes = encode(['c', 'e', 'g', 'bb', 'f##'], octave=4)
+        self.assertEqual(notes.dtype, NOTE_DTYPE)
+        self.assertEqual(notes.itemsize, 3)
+        self.assertEqual(
+            to_names(notes), ['c', 'e', 'g', 'bb', 'f##'])
+        self.assertEqual(
+            to_midi(notes).tolist(), [60, 64, 67, 70, 67])
+        keys = [21, 60, 61, 70, 108]
+        self.assertEqual(to_midi(from_midi(keys)).tolist(), keys)
+
+    def test_same_codes(self):
+        '''Every representation of C major agrees.'''
+        ref = as_codes(['c', 'e', 'g'])
+        for notes in (
+                encode(['c', 'e', 'g']), [60, 64, 67],
+                np.array([48, 76, 91]), np.array(['c', 'e', 'g']),
+                np.array([b'c', b'e', b'g'])):
+            self.assertEqual(as_codes(notes).tolist(), ref.tolist())
+
+    def test_inplacetuning_inputs(self):
+        '''inplacetuning accepts structured notes and MIDI keys.'''
+        ref = inplacetuning(['c', 'e', 'g'], method='log-lstsq')
+        for notes in (
+                encode(['c', 'e', 'g'], octave=5), [72, 76, 79],
+                np.array(['c', 'e', 'g'])):
+            res = inplacetuning(notes, method='log-lstsq')
+            self.assertTrue(np.allclose(res[0], ref[0]))
+        for method in ('L-BFGS-B', 'log-lstsq'):
+            with self.assertRaises(AssertionError):
+                inplacetuning([], method=method)
+
+    def test_spelling(self):
+        '''MIDI chords are spelled from their context.'''
+        self.assertEqual(
+            to_names(from_midi([64, 68, 71])), ['e', 'g#', 'b'])
+        self.assertEqual(
+            to_names(from_midi([63, 66, 70])), ['eb', 'gb', 'bb'])
+        self.assertEqual(
+            to_names(from_midi([71, 74, 77])), ['b', 'd', 'f'])
+        self.assertEqual(to_midi(from_midi([59, 63, 66])).tolist(),
+                         [59, 63, 66])
+
+    def test_midi_triads(self):
+        '''Every major and minor triad from MIDI keys is just.'''
+        for root in range(60, 72):
+            for third, ratio in ((4, 5/4), (3, 6/5)):
+                keys = [root, root + third, root + 7]
+                fopt, _finit, _ropt, _rdes, _rinit, cost = (
+                    inplacetuning(keys, method='log-lstsq'))
+                self.assertLess(cost, 1e-9, keys)
+                self.assertAlmostEqual(fopt[1]/fopt[0], ratio)
+                self.assertAlmostEqual(fopt[2]/fopt[0], 3/2)
+
+    def test_octaves(self):
+        '''Structured notes and MIDI keys start in their octave.'''
+        for notes in (encode(['c', 'e', 'g'], octave=[3, 4, 5]),
+                      [48, 64, 79]):
+            fopt, feq, ropt, rdes, _rinit, cost = inplacetuning(
+                notes, method='log-lstsq')
+            self.assertTrue(np.allclose(feq, [130.81, 329.63, 783.99],
+                                        atol=0.01))
+            self.assertTrue(np.allclose(rdes, [5/2, 6, 12/5]))
+            self.assertTrue(np.allclose(ropt, rdes))
+            self.assertLess(cost, 1e-9)
+            self.assertAlmostEqual(fopt[2]/fopt[0], 6)
+
+    def test_frequencies(self):
+        '''Nominal frequencies for any reference pitch.'''
+        self.assertTrue(np.allclose(
+            frequencies(['a', 'abb', 'g##', 'cbb', 'b#']),
+            [440, 392, 880, 466.16, 523.25], atol=0.01))
+        self.assertTrue(np.allclose(
+            frequencies(['a', 'c'], reference=415),
+            [415, 415*2**(3/12)]))
+        self.assertTrue(np.allclose(
+            frequencies([69, 81], reference=442), [442, 884]))
+        meantone = np.zeros(12)
+        meantone[4] = -13.7
+        self.assertAlmostEqual(
+            frequencies([64], temperament=meantone)[0],
+            440*2**((-5 - 0.137)/12))
+
+    def test_temperament(self):
+        '''Solves start from another temperament.'''
+        meantone = np.zeros(12)
+        meantone[[4, 7]] = -13.7, -3.4
+        chords = [['c', 'e', 'g'], [60, 64, 67]]
+        fopt = inplacetuning_batch(chords, temperament=meantone)[0]
+        for kk, chord in enumerate(chords):
+            res = inplacetuning(
+                chord, method='log-lstsq', temperament=meantone)
+            self.assertTrue(np.allclose(res[1], frequencies(
+                chord, temperament=meantone)))
+            self.assertAlmostEqual(res[1][1]/res[1][0], 1.25, 3)
+            self.assertTrue(np.allclose(res[2], res[3]))
+            self.assertTrue(np.allclose(fopt[kk], res[0]))
+        finit = tune_progression(
+            chords[:1], temperament=meantone)[1][0]
+        self.assertTrue(np.allclose(finit, res[1]*2))
+        tuner = Tuner(temperament=meantone)
+        self.assertAlmostEqual(
+            tuner.note_on('e')['e'], res[1][1]*2)
+
+    def test_reference(self):
+        '''Reference pitch scales the solution.'''
+        ref = inplacetuning(['c', 'e', 'g'], method='log-lstsq')[0]
+        fopt = inplacetuning(
+            ['c', 'e', 'g'], method='log-lstsq', reference=415)[0]
+        self.assertTrue(np.allclose(fopt, ref*415/440))
+
+    def test_invalid(self):
+        '''Unknown names are rejected.'''
+        with self.assertRaises(AssertionError):
+            as_codes(['c', 'h'])
+        with self.assertRaises(AssertionError):
+            encode(['c###'])
+
+if __name__ == '__main__':
+    unittest.main()
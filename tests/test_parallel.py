@@ -0,0 +1,31 @@
+'''Test tuning corpora in worker processes.'''
+
+import unittest
+
+import numpy as np
+
+from inplacetuning import inplacetuning
+from inplacetuning.parallel import tune_chords, _chunksize
+
+class TestParallel(unittest.TestCase):
+    '''Test tuning corpora in worker processes.'''
+
+    def test_input_order(self):
+        '''Results match serial runs in input order.'''
+        chords = [
+            ['c', 'e', 'g'], ['d', 'f', 'a'], ['c', 'e'],
+            ['e', 'g', 'b'], ['f', 'a', 'c'], ['g', 'b', 'd'],
+        ]
+        res = tune_chords(chords, method='log-lstsq', max_workers=2)
+        self.assertEqual(len(res), len(chords))
+        for chord, par in zip(chords, res):
+            ser = inplacetuning(chord, method='log-lstsq')
+            self.assertTrue(np.allclose(par[0], ser[0], rtol=1e-5))
+
+    def test_chunksize(self):
+        '''About four chunks per worker.'''
+        self.assertEqual(_chunksize(1000, 32), 7)
+        self.assertEqual(_chunksize(3, 32), 1)
+
+if __name__ == '__main__':
+    unittest.main()
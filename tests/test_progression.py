@@ -0,0 +1,57 @@
+'''Test joint tuning of chord progressions.'''
+
+import unittest
+
+import numpy as np
+
+from inplacetuning import inplacetuning, tune_progression
+
+def _jumps(freq_opt, chords):
+    '''Cents moved by the common tones of consecutive chords.'''
+    out = []
+    for kk in range(1, len(chords)):
+        for ii, n0 in enumerate(chords[kk]):
+            if n0 in chords[kk - 1]:
+                f0 = freq_opt[kk - 1][chords[kk - 1].index(n0)]
+                out.append(abs(1200*np.log2(freq_opt[kk][ii]/f0)))
+    return np.array(out)
+
+class TestProgression(unittest.TestCase):
+    '''Test joint tuning of chord progressions.'''
+
+    def setUp(self):
+        '''A comma pump, repeated.'''
+        self.chords = [
+            ['c', 'e', 'g'], ['c', 'f', 'a'], ['d', 'f', 'a'],
+            ['d', 'g', 'b'], ['c', 'e', 'g'], ['a', 'c', 'e'],
+        ]*10
+
+    def test_independent(self):
+        '''Without continuity every chord is tuned on its own.'''
+        fopt, feq, cost = tune_progression(
+            self.chords[:6], continuity=0)
+        for chord, f0, e0, c0 in zip(self.chords, fopt, feq, cost):
+            ref = inplacetuning(chord, method='log-lstsq')
+            self.assertTrue(np.allclose(e0, ref[1]))
+            cents = 1200*np.log2(f0/ref[0])
+            self.assertTrue(np.all(np.abs(cents) < 0.05))
+            self.assertLess(c0, 1e-3)
+
+    def test_common_tones(self):
+        '''Held notes move less than with chords tuned alone.'''
+        alone = tune_progression(self.chords, continuity=0)[0]
+        joint, feq, _cost = tune_progression(self.chords)
+        self.assertLess(
+            _jumps(joint, self.chords).max(),
+            _jumps(alone, self.chords).max()/2)
+        cents = np.concatenate([
+            1200*np.log2(f0/e0) for f0, e0 in zip(joint, feq)])
+        self.assertTrue(np.all(np.abs(cents) < 30))
+
+    def test_undefined(self):
+        '''Intervals without semantics raise KeyError.'''
+        with self.assertRaises(KeyError):
+            tune_progression([['c', 'e'], ['a##', 'ab']])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+'''Test the result of inplacetuning.'''
+
+import pickle
+import unittest
+
+import numpy as np
+
+from inplacetuning import inplacetuning, TuningResult
+
+class TestResult(unittest.TestCase):
+    '''Test the result of inplacetuning.'''
+
+    def setUp(self):
+        self.res = inplacetuning(['c', 'e', 'g'], method='log-lstsq')
+
+    def test_unpack(self):
+        '''Unpacks like the old 6-tuple.'''
+        self.assertIsInstance(self.res, TuningResult)
+        fopt, finit, ropt, rdes, rinit, cost = self.res
+        self.assertEqual(len(self.res), 6)
+        self.assertIs(fopt, self.res.freq_opt)
+        self.assertIs(finit, self.res.freq_init)
+        self.assertIs(rdes, self.res.ratio_desired)
+        self.assertEqual(cost, self.res.cost)
+        self.assertTrue(np.allclose(ropt, rdes))
+        self.assertTrue(np.allclose(rinit, self.res.ratio_init))
+
+    def test_index(self):
+        '''Indexes and slices in the same order.'''
+        self.assertIs(self.res[0], self.res.freq_opt)
+        self.assertEqual(self.res[-1], self.res.cost)
+        fopt, finit = self.res[:2]
+        self.assertIs(finit, self.res.freq_init)
+
+    def test_lazy(self):
+        '''Ratios are only computed when asked for.'''
+        self.assertIsNone(self.res._ratio_opt)
+        self.assertIsNone(self.res._ratio_init)
+        _fopt = self.res.freq_opt
+        self.assertIsNone(self.res._ratio_opt)
+        ropt = self.res.ratio_opt
+        self.assertIs(self.res.ratio_opt, ropt)
+        self.assertIsNone(self.res._ratio_init)
+
+    def test_cents(self):
+        '''Offsets from equal temperment and remaining errors.'''
+        cents = self.res.cents - self.res.cents[0]
+        self.assertTrue(np.allclose(
+            cents, [0, -13.69, 1.96], atol=0.01))
+        self.assertTrue(np.allclose(self.res.cents_error, 0))
+
+    def test_pickle(self):
+        '''Survives being sent to and from worker processes.'''
+        res = pickle.loads(pickle.dumps(self.res))
+        self.assertTrue(np.allclose(res.freq_opt, self.res.freq_opt))
+        self.assertTrue(
+            np.allclose(res.ratio_opt, self.res.ratio_opt))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+'''Test swappable interval semantics.'''
+
+import unittest
+
+import numpy as np
+
+from inplacetuning import inplacetuning, inplacetuning_batch
+from inplacetuning.semantics import (
+    _INTERVALS, _INTERVAL_CODES, ratio_table)
+from utils import _NOTENAMES
+
+class TestSemantics(unittest.TestCase):
+    '''Test swappable interval semantics.'''
+
+    def _ratio(self, n0, n1, semantics):
+        table = ratio_table(semantics)
+        return table[_NOTENAMES.index(n0), _NOTENAMES.index(n1)]
+
+    def test_codes(self):
+        '''Every note pair has a small integer interval code.'''
+        self.assertEqual(_INTERVAL_CODES.dtype, np.int8)
+        c0, e0 = _NOTENAMES.index('c'), _NOTENAMES.index('e')
+        self.assertEqual(_INTERVALS[_INTERVAL_CODES[c0, e0]], 'M3')
+
+    def test_just(self):
+        '''5-limit ratios.'''
+        self.assertEqual(self._ratio('c', 'e', 'just'), 5/4)
+        self.assertEqual(self._ratio('g', 'f', 'just'), 16/9)
+        self.assertTrue(np.isnan(self._ratio('cbb', 'c##', 'just')))
+
+    def test_pythagorean(self):
+        '''Stacked pure fifths.'''
+        self.assertAlmostEqual(
+            self._ratio('c', 'e', 'pythagorean'), 81/64)
+        self.assertAlmostEqual(
+            self._ratio('c', 'eb', 'pythagorean'), 32/27)
+        self.assertAlmostEqual(
+            self._ratio('c', 'g', 'pythagorean'), 3/2)
+        fopt = inplacetuning(
+            ['c', 'e', 'g'], semantics='pythagorean')[0]
+        self.assertAlmostEqual(fopt[1]/fopt[0], 81/64, places=4)
+
+    def test_seven_limit(self):
+        '''Dominant seventh with a harmonic seventh.'''
+        self.assertEqual(self._ratio('g', 'f', '7-limit'), 7/4)
+        self.assertEqual(self._ratio('c', 'e', '7-limit'), 5/4)
+        fopt = inplacetuning(
+            [55, 59, 65], method='log-lstsq', semantics='7-limit')[0]
+        self.assertAlmostEqual(fopt[2]/fopt[0], 7/4)
+        self.assertAlmostEqual(fopt[2]/fopt[1], 7/5)
+
+    def test_dict(self):
+        '''Custom semantics by interval name.'''
+        semantics = {'P1': 1, 'M3': 5/4, 'P5': 3/2, 'm3': 6/5}
+        table = ratio_table(semantics)
+        self.assertIs(ratio_table(table), table)
+        res0 = inplacetuning(['c', 'e', 'g'], semantics=semantics)
+        res1 = inplacetuning(['c', 'e', 'g'], semantics=table)
+        self.assertTrue(np.allclose(res0[0], res1[0]))
+        with self.assertRaises(KeyError):
+            inplacetuning(['c', 'd', 'g'], semantics=semantics)
+
+    def test_unknown(self):
+        '''Unknown names are rejected.'''
+        with self.assertRaises(ValueError):
+            inplacetuning(['c', 'e', 'g'], semantics='meantone')
+
+    def test_batch(self):
+        '''Batches use the same semantics.'''
+        chords = [['c', 'e', 'g'], ['g', 'b', 'd', 'f']]
+        fopt = inplacetuning_batch(
+            chords, semantics='pythagorean')[0]
+        for kk, chord in enumerate(chords):
+            res = inplacetuning(
+                chord, method='log-lstsq', semantics='pythagorean')
+            self.assertTrue(
+                np.allclose(fopt[kk, :len(chord)], res[0]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+'''Test the UDP tuning server.'''
+
+import asyncio
+import unittest
+
+import numpy as np
+
+from inplacetuning import inplacetuning
+from inplacetuning.server import (
+    TuningServer, osc_message, parse_osc, serve)
+
+class _Transport(object):
+    '''Collect replies instead of sending them.'''
+
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, data, addr):
+        self.sent.append((parse_osc(data), addr))
+
+class _Client(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.replies = asyncio.Queue()
+
+    def datagram_received(self, data, addr):
+        self.replies.put_nowait(parse_osc(data))
+
+class TestServer(unittest.TestCase):
+    '''Test the UDP tuning server.'''
+
+    def test_osc(self):
+        '''Messages survive encoding.'''
+        msg = osc_message('/freqs', ['c', 'e#', 60, 1.5])
+        self.assertEqual(len(msg) % 4, 0)
+        address, args = parse_osc(msg)
+        self.assertEqual(address, '/freqs')
+        self.assertEqual(args, ['c', 'e#', 60, 1.5])
+
+    def test_round_trip(self):
+        '''Frequencies, cents and latency over a real socket.'''
+        async def run():
+            transport, server = await serve(port=0)
+            port = transport.get_extra_info('sockname')[1]
+            loop = asyncio.get_running_loop()
+            client, proto = await loop.create_datagram_endpoint(
+                _Client, remote_addr=('127.0.0.1', port))
+            out = []
+            for msg in (
+                    osc_message('/freqs', ['c', 'e', 'g']),
+                    osc_message('/cents', [60, 64, 67]),
+                    osc_message('/freqs', ['h']),
+                    osc_message('/stats')):
+                client.sendto(msg)
+                out.append(await asyncio.wait_for(
+                    proto.replies.get(), 5))
+            client.close()
+            transport.close()
+            return out
+
+        freqs, cents, error, stats = asyncio.run(run())
+        ref = inplacetuning(['c', 'e', 'g'], method='log-lstsq')[0]
+        self.assertEqual(freqs[0], '/freqs')
+        self.assertTrue(np.allclose(freqs[1], ref, rtol=1e-6))
+        self.assertEqual(cents[0], '/cents')
+        self.assertTrue(np.all(np.abs(cents[1]) < 20))
+        self.assertEqual(error[0], '/error')
+        self.assertEqual(stats[0], '/stats')
+        self.assertEqual(stats[1][0], 3)
+        self.assertLessEqual(stats[1][1], stats[1][2])
+
+    def test_coalesce(self):
+        '''Concurrent identical requests share one solve.'''
+        async def run():
+            server = TuningServer()
+            server.connection_made(_Transport())
+            msg = osc_message('/freqs', ['d', 'f', 'a'])
+            for port in range(3):
+                server.datagram_received(msg, ('127.0.0.1', port))
+            while len(server.transport.sent) < 3:
+                await asyncio.sleep(0.001)
+            return server
+
+        server = asyncio.run(run())
+        self.assertEqual(server.coalesced, 2)
+        self.assertEqual(server.cache.info().misses, 1)
+        replies = [r0[0][1] for r0 in server.transport.sent]
+        self.assertEqual(replies[0], replies[1])
+        self.assertEqual(replies[0], replies[2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+'''Test the tuning cache shared between processes.'''
+
+import subprocess
+import sys
+import unittest
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from inplacetuning import inplacetuning, TuningCache
+from inplacetuning.shared import SharedTuningCache
+
+class TestShared(unittest.TestCase):
+    '''Test the tuning cache shared between processes.'''
+
+    def setUp(self):
+        self.writer = SharedTuningCache(create=True, capacity=64)
+
+    def tearDown(self):
+        self.writer.close()
+        self.writer.unlink()
+
+    def test_publish(self):
+        '''Readers hit shapes the writer published.'''
+        self.writer.publish([['c', 'e', 'g']], method='log-lstsq')
+        self.assertEqual(len(self.writer), 1)
+        reader = SharedTuningCache(self.writer.name)
+        hit = inplacetuning(
+            ['c#', 'e#', 'g#'], method='log-lstsq', cache=reader)
+        cache = TuningCache()
+        inplacetuning(
+            ['c', 'e', 'g'], method='log-lstsq', cache=cache)
+        ref = inplacetuning(
+            ['c#', 'e#', 'g#'], method='log-lstsq', cache=cache)
+        self.assertEqual(reader.info().hits, 1)
+        self.assertTrue(np.array_equal(hit[0], ref[0]))
+        self.assertEqual(hit.cost, ref.cost)
+        reader.close()
+
+    def test_writer_fills_misses(self):
+        '''Shapes the writer solves become visible to readers.'''
+        reader = SharedTuningCache(self.writer.name)
+        inplacetuning(['d', 'f', 'a'], cache=reader)
+        self.assertEqual(len(reader), 0)
+        inplacetuning(['d', 'f', 'a'], cache=reader)
+        self.assertEqual(reader.info().hits, 1)
+        inplacetuning(['e', 'g', 'b'], cache=self.writer)
+        self.assertEqual(len(reader), 1)
+        inplacetuning(['e', 'g', 'b'], cache=reader)
+        self.assertEqual(reader.info().hits, 2)
+        reader.close()
+
+    def test_drain(self):
+        '''Shapes readers solved reach the writer.'''
+        reader = SharedTuningCache(self.writer.name)
+        ref = inplacetuning(['d', 'f', 'a'], cache=reader)
+        self.assertEqual(len(self.writer), 0)
+        self.assertEqual(self.writer.drain(), 1)
+        self.assertEqual(self.writer.drain(), 0)
+        self.assertEqual(len(reader), 1)
+        other = SharedTuningCache(self.writer.name, local_size=0)
+        hit = inplacetuning(['e', 'g', 'b'], cache=other)
+        self.assertEqual(other.info().hits, 1)
+        self.assertTrue(np.allclose(
+            hit[0]/hit[0][0], ref[0]/ref[0][0]))
+        with self.assertRaises(AssertionError):
+            reader.drain()
+        reader.close()
+        other.close()
+
+    def test_drain_torn(self):
+        '''Requests written over by another reader are dropped.'''
+        reader = SharedTuningCache(self.writer.name)
+        inplacetuning(['d', 'f', 'a'], cache=reader)
+        ii = np.flatnonzero(reader._requests['state'])[0]
+        reader._requests['cost'][ii] += 1
+        self.assertEqual(self.writer.drain(), 0)
+        self.assertEqual(len(self.writer), 0)
+        inplacetuning(['e', 'g', 'b'], cache=reader)
+        self.assertEqual(reader.info().hits, 1)
+        self.assertEqual(self.writer.drain(), 1)
+        reader.close()
+
+    def test_read_only(self):
+        '''Readers cannot write into the segment.'''
+        self.writer.publish([['c', 'e', 'g']])
+        reader = SharedTuningCache(self.writer.name, local_size=0)
+        with self.assertRaises(ValueError):
+            reader._freqs[0, 0] = 1
+        inplacetuning(['d', 'f', 'a'], cache=reader)
+        inplacetuning(['d', 'f', 'a'], cache=reader)
+        self.assertEqual(reader.info().misses, 2)
+        reader.close()
+
+    def test_full(self):
+        '''Publishing stops at the load limit.'''
+        chords = [[n0, 'c'] for n0 in 'abcdefg'] + [
+            [n0 + '#', 'c'] for n0 in 'abcdefg']
+        writer = SharedTuningCache(create=True, capacity=4)
+        writer.publish(chords, method='log-lstsq')
+        self.assertEqual(len(writer), 3)
+        writer.close()
+        writer.unlink()
+
+    def test_other_process(self):
+        '''Another interpreter reads without solving.'''
+        self.writer.publish([['c', 'e', 'g']])
+        code = (
+            'from inplacetuning import inplacetuning\n'
+            'from inplacetuning.shared import SharedTuningCache\n'
+            'cache = SharedTuningCache(%r)\n'
+            'inplacetuning(["c#", "e#", "g#"], cache=cache)\n'
+            'inplacetuning(["d", "f", "a"], cache=cache)\n'
+            'print(cache.info().hits)\n'
+            'cache.close()\n' % self.writer.name)
+        out = subprocess.run(
+            [sys.executable, '-c', code], check=True,
+            capture_output=True, text=True)
+        self.assertEqual(out.stdout.strip(), '1')
+        self.assertEqual(out.stderr, '')
+
+        # The reader's miss is published and its exit leaves the
+        # segment in place
+        self.assertEqual(self.writer.drain(), 1)
+        reader = SharedTuningCache(self.writer.name)
+        self.assertEqual(len(reader), 2)
+        reader.close()
+
+    def test_not_a_cache(self):
+        '''Segments of other programs are rejected.'''
+        shm = shared_memory.SharedMemory(create=True, size=64)
+        with self.assertRaises(ValueError):
+            SharedTuningCache(shm.name)
+        shm.close()
+        shm.unlink()
+
+if __name__ == '__main__':
+    unittest.main()
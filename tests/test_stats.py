@@ -0,0 +1,50 @@
+'''Test per-stage instrumentation.'''
+
+import unittest
+
+from inplacetuning import inplacetuning, TuningCache, TuningStats
+
+class TestStats(unittest.TestCase):
+    '''Test per-stage instrumentation.'''
+
+    def test_stages(self):
+        '''Every stage is timed in order.'''
+        # D-F-A-C has a comma, so it goes through the optimizer
+        stats = TuningStats()
+        inplacetuning(['d', 'f', 'a', 'c'], stats=stats)
+        self.assertEqual(list(stats.stages), [
+            'validate', 'pairs', 'intervals', 'freqs', 'solve'])
+        self.assertTrue(
+            all([t0 >= 0 for t0 in stats.stages.values()]))
+        self.assertGreater(stats.nfev, 0)
+        self.assertTrue(stats.success)
+
+    def test_cache_hit(self):
+        '''Cache hits skip the solver.'''
+        cache = TuningCache()
+        inplacetuning(['c', 'e', 'g'], cache=cache)
+        stats = TuningStats()
+        inplacetuning(['c#', 'e#', 'g#'], cache=cache, stats=stats)
+        self.assertTrue(stats.cache_hit)
+        self.assertNotIn('solve', stats.stages)
+        self.assertEqual(stats.nfev, 0)
+
+    def test_exact(self):
+        '''Chords without a comma skip the optimizer.'''
+        stats = TuningStats()
+        inplacetuning(['c', 'e', 'g'], stats=stats)
+        self.assertEqual((stats.nfev, stats.nit), (0, 0))
+        self.assertEqual(stats.message, 'Exact solution.')
+        self.assertTrue(stats.success)
+
+    def test_closed_form(self):
+        '''log-lstsq evaluates nothing.'''
+        stats = TuningStats()
+        inplacetuning(
+            ['c', 'e', 'g'], method='log-lstsq', stats=stats)
+        self.assertEqual((stats.nfev, stats.nit), (0, 0))
+        self.assertTrue(stats.success)
+        self.assertGreater(stats.total, 0)
+
+if __name__ == '__main__':
+    unittest.main()
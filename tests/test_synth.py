@@ -0,0 +1,38 @@
+'''Test block-based synthesis.'''
+
+import unittest
+
+import numpy as np
+
+from inplacetuning.synth import Oscillators, render
+
+class TestSynth(unittest.TestCase):
+    '''Test block-based synthesis.'''
+
+    def test_matches_full_render(self):
+        '''Blocks join into the same signal as one long sine.'''
+        rate, freqs = 8000, [440, 550]
+        osc = Oscillators(rate=rate, block_size=100)
+        blocks = np.concatenate(
+            [osc.render(freqs) for _ in range(10)])
+        t = np.arange(1, 1001)/rate
+        ref = np.mean([np.sin(2*np.pi*f*t) for f in freqs], axis=0)
+        self.assertTrue(np.allclose(blocks, ref))
+
+    def test_phase_continuous(self):
+        '''Changing frequency does not jump the waveform.'''
+        osc = Oscillators(rate=8000, block_size=64)
+        a = osc.render([440])
+        b = osc.render([460])
+        step = 2*np.pi*460/8000
+        self.assertLess(abs(b[0] - a[-1]), step*1.01)
+
+    def test_render_lengths(self):
+        '''Durations are split into blocks.'''
+        blocks = list(render(
+            [([440], 0.01), ([330, 440], 0.02)],
+            rate=1000, block_size=8))
+        self.assertEqual([b.size for b in blocks], [8, 2, 8, 8, 4])
+
+if __name__ == '__main__':
+    unittest.main()
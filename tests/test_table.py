@@ -0,0 +1,94 @@
+'''Test the precomputed chord table.'''
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from inplacetuning import inplacetuning, inplacetuning_batch
+from inplacetuning.table import (
+    build_table, _binomials, _chunks, _offsets, _ranks)
+
+class TestTable(unittest.TestCase):
+    '''Test the precomputed chord table.'''
+
+    @classmethod
+    def setUpClass(cls):
+        '''Table of chords up to four notes.'''
+        cls.tmp = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.tmp, 'table.npy')
+        cls.table = build_table(cls.path, max_notes=4, max_workers=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.table
+        os.remove(cls.path)
+        os.rmdir(cls.tmp)
+
+    def test_ranks_unique(self):
+        '''Every chord gets its own row.'''
+        binom, offsets = _binomials(4), _offsets(4)
+        rows = np.concatenate([
+            _ranks(c0, binom, offsets) for c0 in _chunks(4, 10000)])
+        self.assertEqual(np.unique(rows).size, rows.size)
+        self.assertEqual(rows.max() + 1, offsets[-1])
+
+    def test_matches_solver(self):
+        '''Lookups agree with solving, in the order given.'''
+        freqs = self.table.lookup(['g', 'c', 'e'])
+        ref = inplacetuning_batch([['c', 'e', 'g']])[0][0]
+        self.assertTrue(np.allclose(freqs, ref[[2, 0, 1]], rtol=1e-6))
+
+    def test_comma(self):
+        '''Chords with a comma also match, whatever the order.'''
+        for chord in (['d', 'f', 'a', 'c'], ['a', 'c', 'f', 'd'],
+                      ['f', 'b', 'd'], ['g', 'bb', 'eb', 'c']):
+            ref = inplacetuning(chord, method='log-lstsq')
+            self.assertGreater(ref.cost, 1e-3)
+            self.assertTrue(np.allclose(
+                self.table.lookup(chord), ref[0], rtol=1e-6))
+
+    def test_duplicates(self):
+        '''Repeated notes share a frequency.'''
+        freqs = self.table.lookup(['c', 'e', 'c'])
+        self.assertEqual(freqs[0], freqs[2])
+
+    def test_missing(self):
+        '''Too many notes or undefined tunings raise KeyError.'''
+        with self.assertRaises(KeyError):
+            self.table.lookup(['c', 'd', 'e', 'f', 'g'])
+        with self.assertRaises(KeyError):
+            self.table.lookup(['a##', 'ab'])
+
+    def test_tune(self):
+        '''Larger chords fall back to the closed-form solver.'''
+        self.assertEqual(
+            self.table.tune(['c', 'e', 'g']),
+            self.table.lookup(['c', 'e', 'g']))
+        freqs = self.table.tune(['c', 'e', 'g', 'b', 'd'])
+        ref = inplacetuning(
+            ['c', 'e', 'g', 'b', 'd'], method='log-lstsq')
+        self.assertTrue(np.allclose(freqs, ref[0]))
+
+    def test_no_scipy(self):
+        '''Table and closed-form tunings never import SciPy.'''
+        code = '; '.join([
+            'import sys',
+            'from inplacetuning import inplacetuning, Tuner',
+            'from inplacetuning.table import ChordTable',
+            'ChordTable(%r).tune(["c", "e", "g", "b", "d"])' % (
+                self.path),
+            'inplacetuning(["c", "e", "g"], method="log-lstsq")',
+            'Tuner().note_on("c")',
+            'print("scipy" in sys.modules)'])
+        root = os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__)))
+        out = subprocess.check_output(
+            [sys.executable, '-c', code], cwd=root)
+        self.assertEqual(out.strip(), b'False')
+
+if __name__ == '__main__':
+    unittest.main()
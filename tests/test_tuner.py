@@ -0,0 +1,49 @@
+'''Test the real-time tuner.'''
+
+import unittest
+
+import numpy as np
+
+from inplacetuning import Tuner, inplacetuning
+from inplacetuning.inplacetuning import _get_ratios
+
+class TestTuner(unittest.TestCase):
+    '''Test the real-time tuner.'''
+
+    def test_single_note(self):
+        '''A lone note sounds at equal temperment.'''
+        tuner = Tuner()
+        changed = tuner.note_on('c')
+        self.assertEqual(list(changed), ['c'])
+        self.assertAlmostEqual(changed['c'], 523.25, places=2)
+
+    def test_triad(self):
+        '''Building up C major matches a one-shot solve.'''
+        tuner = Tuner()
+        for note in ('c', 'e', 'g'):
+            tuner.note_on(note)
+        freqs = np.array(list(tuner.sounding.values()))
+        _fopt, _feq, _ropt, rdes, _rinit, _cost = inplacetuning(
+            ['c', 'e', 'g'], method='log-lstsq')
+        self.assertTrue(np.allclose(_get_ratios(freqs), rdes))
+
+    def test_only_changes(self):
+        '''Repeated and stray events report nothing.'''
+        tuner = Tuner()
+        tuner.note_on('c')
+        tuner.note_on('e')
+        self.assertEqual(tuner.note_on('e'), {})
+        self.assertEqual(tuner.note_off('g'), {})
+
+    def test_note_off(self):
+        '''Released notes stop sounding.'''
+        tuner = Tuner()
+        tuner.note_on('c')
+        tuner.note_on('e')
+        tuner.note_off('c')
+        self.assertEqual(list(tuner.sounding), ['e'])
+        tuner.reset()
+        self.assertEqual(len(tuner.sounding), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+'''Test the streaming WAV writer.'''
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from scipy.io import wavfile
+
+from inplacetuning.wavfile import WavWriter
+
+class TestWavfile(unittest.TestCase):
+    '''Test the streaming WAV writer.'''
+
+    def setUp(self):
+        '''Two blocks of a sine.'''
+        fd, self.path = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        t = np.arange(1000)/8000
+        self.data = 0.5*np.sin(2*np.pi*440*t)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_int16(self):
+        '''Scaled to 16-bit PCM.'''
+        with WavWriter(self.path, 8000) as wav:
+            wav.write(self.data[:600])
+            wav.write(self.data[600:])
+        rate, data = wavfile.read(self.path)
+        self.assertEqual(rate, 8000)
+        self.assertEqual(data.dtype, np.int16)
+        ref = np.rint(self.data*32767).astype(np.int16)
+        self.assertTrue(np.array_equal(data, ref))
+
+    def test_float32_stereo(self):
+        '''Interleaved 32-bit float.'''
+        stereo = np.stack((self.data, -self.data), axis=1)
+        with WavWriter(self.path, 8000, channels=2,
+                       dtype='float32') as wav:
+            wav.write(stereo[:333])
+            wav.write(stereo[333:])
+        _rate, data = wavfile.read(self.path)
+        self.assertEqual(data.shape, (1000, 2))
+        self.assertTrue(np.allclose(data, stereo, atol=1e-7))
+
+    def test_clipping(self):
+        '''Out of range samples are clipped.'''
+        with WavWriter(self.path, 8000) as wav:
+            wav.write(np.array([2.0, -2.0, 1.0, -1.0]))
+        _rate, data = wavfile.read(self.path)
+        self.assertEqual(
+            data.tolist(), [32767, -32768, 32767, -32767])
+
+    def test_size_limit(self):
+        '''Blocks past 4 GiB are refused before they are written.'''
+        with WavWriter(self.path, 8000) as wav:
+            wav.write(self.data[:600])
+            wav.frames += (1 << 31) - 600
+            with self.assertRaises(ValueError):
+                wav.write(self.data[600:])
+            wav.frames -= (1 << 31) - 600
+        _rate, data = wavfile.read(self.path)
+        self.assertEqual(data.size, 600)
+
+if __name__ == '__main__':
+    unittest.main()
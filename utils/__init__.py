@@ -1 +1 @@
-from .utils import _name_to_inverval
+from .utils import _name_to_inverval, _NOTENAMES
@@ -1,575 +1,89 @@
-'''Bulky functions.'''
+'''Bulky functions.
+
+Interval names are computed once at import from the letter distance
+and accidental offset of every pair of note spellings and stored in
+an integer-indexed table, so a lookup is two dict hits and two
+tuple indexings.
+'''
+
+# Note names accepted by inplacetuning()
+_NOTENAMES = [
+    'a', 'a#', 'a##', 'ab', 'abb',
+    'b', 'b#', 'b##', 'bb', 'bbb',
+    'c', 'c#', 'c##', 'cb', 'cbb',
+    'd', 'd#', 'd##', 'db', 'dbb',
+    'e', 'e#', 'e##', 'eb', 'ebb',
+    'f', 'f#', 'f##', 'fb', 'fbb',
+    'g', 'g#', 'g##', 'gb', 'gbb'
+]
+
+# Letter names in scale order with their natural pitch classes
+_LETTERS = 'cdefgab'
+_NATURALS = (0, 2, 4, 5, 7, 9, 11)
+
+# Semitones of the perfect/major interval for each letter distance
+_REFERENCE = (0, 2, 4, 5, 7, 9, 11)
+_PERFECT = (True, False, False, True, True, False, False)
+
+# Spell notes with up to this many sharps or flats
+_MAX_ACCIDENTALS = 4
+
+def _spellings():
+    '''All note spellings as (name, letter index, semitone).'''
+    out = []
+    for ll, letter in enumerate(_LETTERS):
+        for acc in range(-_MAX_ACCIDENTALS, _MAX_ACCIDENTALS + 1):
+            suffix = '#'*acc if acc > 0 else 'b'*(-acc)
+            out.append((letter + suffix, ll, _NATURALS[ll] + acc))
+    return out
+
+def _interval_name(steps, dev):
+    '''Name of an interval from its letter steps and deviation.
+
+    Parameters
+    ----------
+    steps : int
+        Letter distance going up, 0 (unison) through 6 (seventh).
+    dev : int
+        Semitones above (+) or below (-) the perfect or major
+        interval with the same letter distance.
+
+    Returns
+    -------
+    str
+        Interval name, e.g., 'M3', 'd5', 'AA1'.  Unisons that
+        would be diminished are reported as diminished octaves.
+    '''
+    number = steps + 1
+    if steps == 0 and dev < 0:
+        return 'd'*(-dev) + '8'
+    if dev > 0:
+        return 'A'*dev + str(number)
+    if _PERFECT[steps]:
+        return ('d'*(-dev) if dev else 'P') + str(number)
+    if dev == 0:
+        return 'M' + str(number)
+    if dev == -1:
+        return 'm' + str(number)
+    return 'd'*(-dev - 1) + str(number)
+
+def _build_tables():
+    '''Compile note indices and the pairwise interval table.'''
+    spellings = _spellings()
+    index = {name: ii for ii, (name, _l, _s) in enumerate(spellings)}
+    table = []
+    for _n0, l0, s0 in spellings:
+        row = []
+        for _n1, l1, s1 in spellings:
+            steps = (l1 - l0) % 7
+            semis = s1 - s0 + (12 if l1 < l0 else 0)
+            dev = semis - _REFERENCE[steps]
+            row.append(_interval_name(steps, dev))
+        table.append(tuple(row))
+    return index, tuple(table)
+
+_NOTE_INDEX, _INTERVAL_TABLE = _build_tables()
 
 def _name_to_inverval(pair):
     '''Lookup interval from pair of notes.'''
-
-    return {
-
-        ('cbb', 'cbb'): 'P1',
-        ('cbb', 'cb'): 'A1',
-        ('cbb', 'dbbbb'): 'd2',
-        ('cbb', 'dbbb'): 'm2',
-        ('cbb', 'dbb'): 'M2',
-        ('cbb', 'db'): 'A2',
-        ('cbb', 'ebbbb'): 'd3',
-        ('cbb', 'ebbb'): 'm3',
-        ('cbb', 'ebb'): 'M3',
-        ('cbb', 'eb'): 'A3',
-        ('cbb', 'fbbb'): 'd4',
-        ('cbb', 'fbb'): 'P4',
-        ('cbb', 'fb'): 'A4',
-        ('cbb', 'gbbb'): 'd5',
-        ('cbb', 'gbb'): 'P5',
-        ('cbb', 'gb'): 'A5',
-        ('cbb', 'abbbb'): 'd6',
-        ('cbb', 'abbb'): 'm6',
-        ('cbb', 'abb'): 'M6',
-        ('cbb', 'ab'): 'A6',
-        ('cbb', 'bbbbb'): 'd7',
-        ('cbb', 'bbbb'): 'm7',
-        ('cbb', 'bbb'): 'M7',
-        ('cbb', 'bb'): 'A7',
-        ('cbb', 'cbbb'): 'd8',
-
-        ('cb', 'cb'): 'P1',
-        ('cb', 'c'): 'A1',
-        ('cb', 'c#'): 'AA1',
-        ('cb', 'dbbb'): 'd2',
-        ('cb', 'dbb'): 'm2',
-        ('cb', 'db'): 'M2',
-        ('cb', 'd'): 'A2',
-        ('cb', 'd#'): 'AA2',
-        ('cb', 'ebbb'): 'd3',
-        ('cb', 'ebb'): 'm3',
-        ('cb', 'eb'): 'M3',
-        ('cb', 'e'): 'A3',
-        ('cb', 'e#'): 'AA3',
-        ('cb', 'fbb'): 'd4',
-        ('cb', 'fb'): 'P4',
-        ('cb', 'f'): 'A4',
-        ('cb', 'f#'): 'AA4',
-        ('cb', 'gbb'): 'd5',
-        ('cb', 'gb'): 'P5',
-        ('cb', 'g'): 'A5',
-        ('cb', 'g#'): 'AA5',
-        ('cb', 'abbb'): 'd6',
-        ('cb', 'abb'): 'm6',
-        ('cb', 'ab'): 'M6',
-        ('cb', 'a'): 'A6',
-        ('cb', 'a#'): 'AA6',
-        ('cb', 'bbbb'): 'd7',
-        ('cb', 'bbb'): 'm7',
-        ('cb', 'bb'): 'M7',
-        ('cb', 'b'): 'A7',
-        ('cb', 'b#'): 'AA7',
-        ('cb', 'cbb'): 'd8',
-
-        ('c', 'c'): 'P1',
-        ('c', 'c#'): 'A1',
-        ('c', 'c##'): 'AA1',
-        ('c', 'dbb'): 'd2',
-        ('c', 'db'): 'm2',
-        ('c', 'd'): 'M2',
-        ('c', 'd#'): 'A2',
-        ('c', 'ebb'): 'd3',
-        ('c', 'eb'): 'm3',
-        ('c', 'e'): 'M3',
-        ('c', 'e#'): 'A3',
-        ('c', 'fb'): 'd4',
-        ('c', 'f'): 'P4',
-        ('c', 'f#'): 'A4',
-        ('c', 'gb'): 'd5',
-        ('c', 'g'): 'P5',
-        ('c', 'g#'): 'A5',
-        ('c', 'abb'): 'd6',
-        ('c', 'ab'): 'm6',
-        ('c', 'a'): 'M6',
-        ('c', 'a#'): 'A6',
-        ('c', 'bbb'): 'd7',
-        ('c', 'bb'): 'm7',
-        ('c', 'b'): 'M7',
-        ('c', 'b#'): 'A7',
-        ('c', 'cb'): 'd8',
-
-        ('c#', 'c#'): 'P1',
-        ('c#', 'c##'): 'A1',
-        ('c#', 'db'): 'd2',
-        ('c#', 'd'): 'm2',
-        ('c#', 'd#'): 'M2',
-        ('c#', 'd##'): 'A2',
-        ('c#', 'eb'): 'd3',
-        ('c#', 'e'): 'm3',
-        ('c#', 'e#'): 'M3',
-        ('c#', 'e##'): 'A3',
-        ('c#', 'fb'): 'dd4',
-        ('c#', 'f'): 'd4',
-        ('c#', 'f#'): 'P4',
-        ('c#', 'f##'): 'A4',
-        ('c#', 'gb'): 'dd5',
-        ('c#', 'g'): 'd5',
-        ('c#', 'g#'): 'P5',
-        ('c#', 'g##'): 'A5',
-        ('c#', 'ab'): 'd6',
-        ('c#', 'a'): 'm6',
-        ('c#', 'a#'): 'M6',
-        ('c#', 'a##'): 'A6',
-        ('c#', 'bb'): 'd7',
-        ('c#', 'b'): 'm7',
-        ('c#', 'b#'): 'M7',
-        ('c#', 'b##'): 'A7',
-        ('c#', 'cb'): 'dd8',
-        ('c#', 'c'): 'd8',
-
-        ('c##', 'c##'): 'P1',
-        ('c##', 'd'): 'd2',
-
-        ('dbb', 'dbb'): 'P1',
-
-        ('db', 'db'): 'P1',
-        ('db', 'd'): 'A1',
-        ('db', 'd#'): 'AA1',
-        ('db', 'ebbb'): 'd2',
-        ('db', 'ebb'): 'm2',
-        ('db', 'eb'): 'M2',
-        ('db', 'e'): 'A2',
-        ('db', 'e#'): 'AA2',
-        ('db', 'fbb'): 'd3',
-        ('db', 'fb'): 'm3',
-        ('db', 'f'): 'M3',
-        ('db', 'f#'): 'A3',
-        ('db', 'gbb'): 'd4',
-        ('db', 'gb'): 'P4',
-        ('db', 'g'): 'A4',
-        ('db', 'g#'): 'AA4',
-        ('db', 'abb'): 'd5',
-        ('db', 'ab'): 'P5',
-        ('db', 'a'): 'A5',
-        ('db', 'a#'): 'AA5',
-        ('db', 'bbbb'): 'd6',
-        ('db', 'bbb'): 'm6',
-        ('db', 'bb'): 'M6',
-        ('db', 'b'): 'A6',
-        ('db', 'b#'): 'AA6',
-        ('db', 'cbb'): 'd7',
-        ('db', 'cb'): 'm7',
-        ('db', 'c'): 'M7',
-        ('db', 'c#'): 'A7',
-        ('db', 'dbb'): 'd8',
-
-        ('d', 'd'): 'P1',
-        ('d', 'd#'): 'A1',
-        ('d', 'ebb'): 'd2',
-        ('d', 'eb'): 'm2',
-        ('d', 'e'): 'M2',
-        ('d', 'e#'): 'A2',
-        ('d', 'fb'): 'd3',
-        ('d', 'f'): 'm3',
-        ('d', 'f#'): 'M3',
-        ('d', 'f##'): 'A3',
-        ('d', 'gb'): 'd4',
-        ('d', 'g'): 'P4',
-        ('d', 'g#'): 'A4',
-        ('d', 'ab'): 'd5',
-        ('d', 'a'): 'P5',
-        ('d', 'a#'): 'A5',
-        ('d', 'bbb'): 'd6',
-        ('d', 'bb'): 'm6',
-        ('d', 'b'): 'M6',
-        ('d', 'b#'): 'A6',
-        ('d', 'cb'): 'd7',
-        ('d', 'c'): 'm7',
-        ('d', 'c#'): 'M7',
-        ('d', 'c##'): 'A7',
-        ('d', 'db'): 'd8',
-
-        ('d#', 'd#'): 'P1',
-        ('d#', 'd##'): 'A1',
-        ('d#', 'eb'): 'd2',
-        ('d#', 'e'): 'm2',
-        ('d#', 'e#'): 'M2',
-        ('d#', 'e##'): 'A2',
-        ('d#', 'fb'): 'dd3',
-        ('d#', 'f'): 'd3',
-        ('d#', 'f#'): 'm3',
-        ('d#', 'f##'): 'M3',
-        ('d#', 'f###'): 'A3',
-        ('d#', 'gb'): 'dd4',
-        ('d#', 'g'): 'd4',
-        ('d#', 'g#'): 'P4',
-        ('d#', 'g##'): 'A4',
-        ('d#', 'ab'): 'dd5',
-        ('d#', 'a'): 'd5',
-        ('d#', 'a#'): 'P5',
-        ('d#', 'a##'): 'A5',
-        ('d#', 'bb'): 'd6',
-        ('d#', 'b'): 'm6',
-        ('d#', 'b#'): 'M6',
-        ('d#', 'b##'): 'A6',
-        ('d#', 'cb'): 'dd7',
-        ('d#', 'c'): 'd7',
-        ('d#', 'c#'): 'm7',
-        ('d#', 'c##'): 'M7',
-        ('d#', 'c###'): 'A7',
-        ('d#', 'db'): 'dd8',
-        ('d#', 'd'): 'd8',
-
-        ('d##', 'd##'): 'P1',
-
-        ('ebb', 'ebb'): 'P1',
-
-        ('eb', 'eb'): 'P1',
-        ('eb', 'e'): 'A1',
-        ('eb', 'e#'): 'AA1',
-        ('eb', 'fbb'): 'd2',
-        ('eb', 'fb'): 'm2',
-        ('eb', 'f'): 'M2',
-        ('eb', 'f#'): 'A2',
-        ('eb', 'gb'): 'm3',
-        ('eb', 'g'): 'M3',
-        ('eb', 'g#'): 'A3',
-        ('eb', 'ab'): 'P4',
-        ('eb', 'a'): 'A4',
-        ('eb', 'a#'): 'AA4',
-        ('eb', 'bb'): 'P5',
-        ('eb', 'b'): 'A5',
-        ('eb', 'b#'): 'AA5',
-        ('eb', 'cb'): 'm6',
-        ('eb', 'c'): 'M6',
-        ('eb', 'c#'): 'A6',
-        ('eb', 'db'): 'm7',
-        ('eb', 'd'): 'M7',
-        ('eb', 'd#'): 'A7',
-        ('eb', 'ebb'): 'd8',
-
-        ('e', 'e'): 'P1',
-        ('e', 'e#'): 'A1',
-        ('e', 'fb'): 'd2',
-        ('e', 'f'): 'm2',
-        ('e', 'f#'): 'M2',
-        ('e', 'gb'): 'd3',
-        ('e', 'g'): 'm3',
-        ('e', 'g#'): 'M3',
-        ('e', 'ab'): 'd4',
-        ('e', 'a'): 'P4',
-        ('e', 'a#'): 'A4',
-        ('e', 'bb'): 'd5',
-        ('e', 'b'): 'P5',
-        ('e', 'b#'): 'A5',
-        ('e', 'cb'): 'd6',
-        ('e', 'c'): 'm6',
-        ('e', 'c#'): 'M6',
-        ('e', 'db'): 'd7',
-        ('e', 'd'): 'm7',
-        ('e', 'd#'): 'M7',
-        ('e', 'eb'): 'd8',
-
-        ('e#', 'e#'): 'P1',
-        ('e#', 'e##'): 'A1',
-        ('e#', 'fb'): 'dd2',
-        ('e#', 'f'): 'd2',
-        ('e#', 'f#'): 'm2',
-        ('e#', 'gb'): 'dd3',
-        ('e#', 'g'): 'd3',
-        ('e#', 'g#'): 'm3',
-        ('e#', 'ab'): 'dd4',
-        ('e#', 'a'): 'd4',
-        ('e#', 'a#'): 'P4',
-        ('e#', 'bb'): 'dd5',
-        ('e#', 'b'): 'd5',
-        ('e#', 'b#'): 'P5',
-        ('e#', 'cb'): 'dd6',
-        ('e#', 'c'): 'd6',
-        ('e#', 'c#'): 'm6',
-        ('e#', 'c##'): 'M6',
-        ('e#', 'db'): 'dd7',
-        ('e#', 'd'): 'd7',
-        ('e#', 'd#'): 'm7',
-        ('e#', 'eb'): 'dd8',
-        ('e#', 'e'): 'd8',
-
-        ('e##', 'e##'): 'P1',
-
-        ('fb', 'fb'): 'P1',
-        ('fb', 'f'): 'A1',
-        ('fb', 'f#'): 'AA1',
-        ('fb', 'gbb'): 'm2',
-        ('fb', 'gb'): 'M2',
-        ('fb', 'g'): 'A2',
-        ('fb', 'g#'): 'AA2',
-        ('fb', 'abb'): 'm3',
-        ('fb', 'ab'): 'M3',
-        ('fb', 'a'): 'A3',
-        ('fb', 'a#'): 'AA3',
-        ('fb', 'bbb'): 'P4',
-        ('fb', 'bb'): 'A4',
-        ('fb', 'b'): 'AA4',
-        ('fb', 'b#'): 'AAA4',
-        ('fb', 'cbb'): 'd5',
-        ('fb', 'cb'): 'P5',
-        ('fb', 'c'): 'A5',
-        ('fb', 'c#'): 'AA5',
-        ('fb', 'dbb'): 'm6',
-        ('fb', 'db'): 'M6',
-        ('fb', 'd'): 'A6',
-        ('fb', 'd#'): 'AA6',
-        ('fb', 'ebb'): 'm7',
-        ('fb', 'eb'): 'M7',
-        ('fb', 'e'): 'A7',
-        ('fb', 'e#'): 'AA7',
-        ('fb', 'fbb'): 'd8',
-
-        ('f', 'f'): 'P1',
-        ('f', 'f#'): 'A1',
-        ('f', 'gb'): 'm2',
-        ('f', 'g'): 'M2',
-        ('f', 'g#'): 'A2',
-        ('f', 'ab'): 'm3',
-        ('f', 'a'): 'M3',
-        ('f', 'a#'): 'A3',
-        ('f', 'bb'): 'P4',
-        ('f', 'b'): 'A4',
-        ('f', 'b#'): 'AA4',
-        ('f', 'cb'): 'd5',
-        ('f', 'c'): 'P5',
-        ('f', 'c#'): 'A5',
-        ('f', 'db'): 'm6',
-        ('f', 'd'): 'M6',
-        ('f', 'd#'): 'A6',
-        ('f', 'eb'): 'm7',
-        ('f', 'e'): 'M7',
-        ('f', 'e#'): 'A7',
-        ('f', 'fb'): 'd8',
-
-        ('f#', 'f#'): 'P1',
-        ('f#', 'f##'): 'A1',
-        ('f#', 'gb'): 'd2',
-        ('f#', 'g'): 'm2',
-        ('f#', 'g#'): 'M2',
-        ('f#', 'ab'): 'd3',
-        ('f#', 'a'): 'm3',
-        ('f#', 'a#'): 'M3',
-        ('f#', 'bb'): 'd4',
-        ('f#', 'b'): 'P4',
-        ('f#', 'b#'): 'A4',
-        ('f#', 'cb'): 'dd5',
-        ('f#', 'c'): 'd5',
-        ('f#', 'c#'): 'P5',
-        ('f#', 'db'): 'd6',
-        ('f#', 'd'): 'm6',
-        ('f#', 'd#'): 'M6',
-        ('f#', 'eb'): 'd7',
-        ('f#', 'e'): 'm7',
-        ('f#', 'e#'): 'M7',
-        ('f#', 'fb'): 'dd8',
-        ('f#', 'f'): 'd8',
-
-        ('f##', 'f##'): 'P1',
-
-        ('gb', 'gb'): 'P1',
-
-        ('g', 'g'): 'P1',
-        ('g', 'a'): 'M2',
-        ('g', 'b'): 'M3',
-        ('g', 'c'): 'P4',
-        ('g', 'd'): 'P5',
-        ('g', 'e'): 'M6',
-        ('g', 'f'): 'm7',
-
-        ('g#', 'g#'): 'P1',
-
-        ('g##', 'g##'): 'P1',
-
-        ('abb', 'abb'): 'P1',
-        ('abb', 'c'): 'A3',
-
-        ('ab', 'ab'): 'P1',
-        ('ab', 'a'): 'A1',
-        ('ab', 'a#'): 'AA1',
-        ('ab', 'bbbb'): 'd2',
-        ('ab', 'bbb'): 'm2',
-        ('ab', 'bb'): 'M2',
-        ('ab', 'b'): 'A2',
-        ('ab', 'b#'): 'AA2',
-        ('ab', 'cbb'): 'd3',
-        ('ab', 'cb'): 'm3',
-        ('ab', 'c'): 'M3',
-        ('ab', 'c#'): 'A3',
-        ('ab', 'dbb'): 'd4',
-        ('ab', 'db'): 'P4',
-        ('ab', 'd'): 'A4',
-        ('ab', 'd#'): 'AA4',
-        ('ab', 'ebb'): 'd5',
-        ('ab', 'eb'): 'P5',
-        ('ab', 'e'): 'A5',
-        ('ab', 'e#'): 'AA5',
-        ('ab', 'fbb'): 'd6',
-        ('ab', 'fb'): 'm6',
-        ('ab', 'f'): 'M6',
-        ('ab', 'f#'): 'A6',
-        ('ab', 'gbb'): 'd7',
-        ('ab', 'gb'): 'm7',
-        ('ab', 'g'): 'M7',
-        ('ab', 'g#'): 'A7',
-        ('ab', 'abb'): 'd8',
-
-        ('a', 'a'): 'P1',
-        ('a', 'a#'): 'A1',
-        ('a', 'bbb'): 'd2',
-        ('a', 'bb'): 'm2',
-        ('a', 'b'): 'M2',
-        ('a', 'b#'): 'A2',
-        ('a', 'cb'): 'd3',
-        ('a', 'c'): 'm3',
-        ('a', 'c#'): 'M3',
-        ('a', 'c##'): 'A3',
-        ('a', 'db'): 'd4',
-        ('a', 'd'): 'P4',
-        ('a', 'd#'): 'A4',
-        ('a', 'eb'): 'd5',
-        ('a', 'e'): 'P5',
-        ('a', 'e#'): 'A5',
-        ('a', 'fb'): 'd6',
-        ('a', 'f'): 'm6',
-        ('a', 'f#'): 'M6',
-        ('a', 'f##'): 'A6',
-        ('a', 'gb'): 'd7',
-        ('a', 'g'): 'm7',
-        ('a', 'g#'): 'M7',
-        ('a', 'g##'): 'A7',
-        ('a', 'ab'): 'd8',
-
-        ('a#', 'a#'): 'P1',
-        ('a#', 'a##'): 'A1',
-        ('a#', 'bb'): 'd2',
-        ('a#', 'b'): 'm2',
-        ('a#', 'b#'): 'M2',
-        ('a#', 'b##'): 'A2',
-        ('a#', 'cb'): 'dd3',
-        ('a#', 'c'): 'd3',
-        ('a#', 'c#'): 'm3',
-        ('a#', 'c##'): 'M3',
-        ('a#', 'c###'): 'A3',
-        ('a#', 'db'): 'dd4',
-        ('a#', 'd'): 'd4',
-        ('a#', 'd#'): 'P4',
-        ('a#', 'd##'): 'A4',
-        ('a#', 'eb'): 'dd5',
-        ('a#', 'e'): 'd5',
-        ('a#', 'e#'): 'P5',
-        ('a#', 'e##'): 'A5',
-        ('a#', 'fb'): 'dd6',
-        ('a#', 'f'): 'd6',
-        ('a#', 'f#'): 'm6',
-        ('a#', 'f##'): 'M6',
-        ('a#', 'f###'): 'A6',
-        ('a#', 'gb'): 'dd7',
-        ('a#', 'g'): 'd7',
-        ('a#', 'g#'): 'm7',
-        ('a#', 'g##'): 'M7',
-        ('a#', 'g###'): 'A7',
-        ('a#', 'ab'): 'dd8',
-        ('a#', 'a'): 'd8',
-
-        ('a##', 'a##'): 'P1',
-        ('a##', 'c#'): 'd3',
-
-        ('bbb', 'bbb'): 'P1',
-        ('bbb', 'c'): 'A2',
-        ('bbb', 'd'): 'A3',
-
-        ('bb', 'bb'): 'P1',
-        ('bb', 'b'): 'A1',
-        ('bb', 'b#'): 'AA1',
-        ('bb', 'cbb'): 'd2',
-        ('bb', 'cb'): 'm2',
-        ('bb', 'c'): 'M2',
-        ('bb', 'c#'): 'A2',
-        ('bb', 'dbb'): 'd3',
-        ('bb', 'db'): 'm3',
-        ('bb', 'd'): 'M3',
-        ('bb', 'd#'): 'A3',
-        ('bb', 'ebb'): 'd4',
-        ('bb', 'eb'): 'P4',
-        ('bb', 'e'): 'A4',
-        ('bb', 'e#'): 'AA4',
-        ('bb', 'fbb'): 'dd5',
-        ('bb', 'fb'): 'd5',
-        ('bb', 'f'): 'P5',
-        ('bb', 'f#'): 'A5',
-        ('bb', 'gbb'): 'd6',
-        ('bb', 'gb'): 'm6',
-        ('bb', 'g'): 'M6',
-        ('bb', 'g#'): 'A6',
-        ('bb', 'abb'): 'd7',
-        ('bb', 'ab'): 'm7',
-        ('bb', 'a'): 'M7',
-        ('bb', 'a#'): 'A7',
-        ('bb', 'bbbb'): 'dd8',
-        ('bb', 'bbb'): 'd8',
-
-        ('b', 'b'): 'P1',
-        ('b', 'b#'): 'A1',
-        ('b', 'cb'): 'd2',
-        ('b', 'c'): 'm2',
-        ('b', 'c#'): 'M2',
-        ('b', 'c##'): 'A2',
-        ('b', 'db'): 'd3',
-        ('b', 'd'): 'm3',
-        ('b', 'd#'): 'M3',
-        ('b', 'd##'): 'A3',
-        ('b', 'eb'): 'd4',
-        ('b', 'e'): 'P4',
-        ('b', 'e#'): 'A4',
-        ('b', 'fb'): 'dd5',
-        ('b', 'f'): 'd5',
-        ('b', 'f#'): 'P5',
-        ('b', 'f##'): 'A5',
-        ('b', 'gb'): 'd6',
-        ('b', 'g'): 'm6',
-        ('b', 'g#'): 'M6',
-        ('b', 'g##'): 'A6',
-        ('b', 'ab'): 'd7',
-        ('b', 'a'): 'm7',
-        ('b', 'a#'): 'M7',
-        ('b', 'a##'): 'A7',
-        ('b', 'bbb'): 'dd8',
-        ('b', 'bb'): 'd8',
-
-        ('b#', 'b#'): 'P1',
-        ('b#', 'b##'): 'A1',
-        ('b#', 'cb'): 'dd2',
-        ('b#', 'c'): 'd2',
-        ('b#', 'c#'): 'm2',
-        ('b#', 'c##'): 'M2',
-        ('b#', 'c###'): 'A2',
-        ('b#', 'db'): 'dd3',
-        ('b#', 'd'): 'd3',
-        ('b#', 'd#'): 'm3',
-        ('b#', 'd##'): 'M3',
-        ('b#', 'd###'): 'A3',
-        ('b#', 'eb'): 'dd4',
-        ('b#', 'e'): 'd4',
-        ('b#', 'e#'): 'P4',
-        ('b#', 'e##'): 'A4',
-        ('b#', 'fb'): 'ddd5',
-        ('b#', 'f'): 'dd5',
-        ('b#', 'f#'): 'd5',
-        ('b#', 'f##'): 'P5',
-        ('b#', 'f###'): 'A5',
-        ('b#', 'gb'): 'dd6',
-        ('b#', 'g'): 'd6',
-        ('b#', 'g#'): 'm6',
-        ('b#', 'g##'): 'M6',
-        ('b#', 'g###'): 'A6',
-        ('b#', 'ab'): 'dd7',
-        ('b#', 'a'): 'd7',
-        ('b#', 'a#'): 'm7',
-        ('b#', 'a##'): 'M7',
-        ('b#', 'a###'): 'A7',
-        ('b#', 'bb'): 'dd8',
-        ('b#', 'b'): 'd8',
-
-        ('b##', 'b##'): 'P1',
-        ('b##', 'c#'): 'd2',
-
-    }[pair]
+    return _INTERVAL_TABLE[_NOTE_INDEX[pair[0]]][_NOTE_INDEX[pair[1]]]